@@ -5,14 +5,37 @@
 #define LED_GREEN  13
 #define LED_RED    14
 
+// Push-to-talk Taster gegen GND
+#define BUTTON_PTT 27
+#define DEBOUNCE_MS 30
+
 String cmd;
 
+int buttonState = HIGH;        // entprellter Zustand (HIGH = losgelassen)
+int buttonReading = HIGH;      // letzter Rohwert
+unsigned long buttonChanged = 0;
+
 void allOff() {
   digitalWrite(LED_RED, LOW);
   digitalWrite(LED_YELLOW, LOW);
   digitalWrite(LED_GREEN, LOW);
 }
 
+// meldet Druecken/Loslassen als BUTTON_DOWN / BUTTON_UP
+void pollButton() {
+  int reading = digitalRead(BUTTON_PTT);
+
+  if (reading != buttonReading) {
+    buttonReading = reading;
+    buttonChanged = millis();
+  }
+
+  if (millis() - buttonChanged >= DEBOUNCE_MS && reading != buttonState) {
+    buttonState = reading;
+    Serial.println(buttonState == LOW ? "BUTTON_DOWN" : "BUTTON_UP");
+  }
+}
+
 void setup() {
   Serial.begin(115200);
   delay(200);
@@ -20,14 +43,18 @@ void setup() {
   pinMode(LED_RED, OUTPUT);
   pinMode(LED_YELLOW, OUTPUT);
   pinMode(LED_GREEN, OUTPUT);
+  pinMode(BUTTON_PTT, INPUT_PULLUP);
 
   allOff();
 
   Serial.println("ESP32 LED Controller ready");
   Serial.println("Commands: red_on, red_off, yellow_on, yellow_off, green_on, green_off, all_off");
+  Serial.println("Events: BUTTON_DOWN, BUTTON_UP");
 }
 
 void loop() {
+  pollButton();
+
   if (!Serial.available()) return;
 
   cmd = Serial.readStringUntil('\n');
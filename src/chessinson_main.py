@@ -1,13 +1,19 @@
 import asyncio
+import json
+import os
 import chess
 from stockfish import Stockfish
 from chess_translator import ChessCoordinateTranslator
 from move_chess_piece import Chess_Robot
 from speech_recognition import listen
+from opening_book import OpeningBook
 
 # Path to Stockfish binary
 STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
 
+# Engine settings for this machine, written by latest/autotune.py
+ENGINE_PROFILE = "engine_profile.json"
+
 
 class AsyncChessRobotController:
     """
@@ -28,18 +34,27 @@ class AsyncChessRobotController:
         self.robot.startup()
 
         # Initialize Stockfish chess engine
+        parameters = {
+            "Threads": 2,
+            "Minimum Thinking Time": 30
+        }
+        if os.path.exists(ENGINE_PROFILE):
+            with open(ENGINE_PROFILE) as f:
+                profile = json.load(f)
+            parameters.update({k: profile[k] for k in ("Threads", "Hash") if k in profile})
+
         self.stockfish = Stockfish(
             path=STOCKFISH_PATH,
             depth=18,
-            parameters={
-                "Threads": 2,
-                "Minimum Thinking Time": 30
-            }
+            parameters=parameters
         )
 
         # Create chess board representation
         self.board = chess.Board()
 
+        # Polyglot opening book, checked before Stockfish
+        self.book = OpeningBook()
+
         # Coordinate translator for robot movement
         self.translator = ChessCoordinateTranslator()
 
@@ -200,6 +215,12 @@ class AsyncChessRobotController:
 
         try:
 
+            # Book move? Then Stockfish is not needed
+            book_move = self.book.choose(self.board)
+            if book_move is not None:
+                print(f"📖 Book move: {book_move}")
+                return book_move
+
             # Run Stockfish in separate thread
             def get_best_move():
                 self.stockfish.set_fen_position(self.board.fen())
@@ -276,6 +297,9 @@ class AsyncChessRobotController:
             if hasattr(self, 'stockfish'):
                 del self.stockfish
 
+            if hasattr(self, 'book'):
+                self.book.close()
+
         except Exception as e:
             print(f"Error during shutdown: {e}")
 
@@ -20,6 +20,10 @@ class Light:
     ILLEGAL-> red blink   (background thread)
     UNKNOWN-> yellow blink(background thread)
     OFF    -> all_off
+
+    Lines sent by the ESP32 (e.g. BUTTON_DOWN / BUTTON_UP from the
+    push-to-talk button) are delivered to callbacks registered with
+    add_listener().
     """
 
     def __init__(
@@ -40,6 +44,11 @@ class Light:
         self._blink_thread: Optional[threading.Thread] = None
         self._stop_blink = threading.Event()
 
+        # Serial reader
+        self._listeners = []
+        self._reader_thread: Optional[threading.Thread] = None
+        self._stop_reader = threading.Event()
+
         if auto_connect:
             self.connect()
 
@@ -100,11 +109,64 @@ class Light:
         except Exception:
             pass
 
+        # a close() stopped the reader, resume delivering events
+        if self._listeners:
+            self._start_reader()
+
     def close(self) -> None:
         self._stop_blinking()
+        self._stop_reader.set()
         if self.ser and self.ser.is_open:
             self.ser.close()
 
+    # ------------------------
+    # Incoming lines (events)
+    # ------------------------
+    def add_listener(self, callback) -> None:
+        """
+        Calls callback(line) for every line the ESP32 sends.
+        """
+        self._listeners.append(callback)
+        self._start_reader()
+
+    def _start_reader(self) -> None:
+        self._stop_reader.clear()  # also keeps a reader alive that has not noticed close() yet
+        if self._reader_thread is None or not self._reader_thread.is_alive():
+            self._reader_thread = threading.Thread(target=self._reader, daemon=True)
+            self._reader_thread.start()
+
+    def _reader(self):
+        # readline() returns a partial line when the port timeout hits
+        # mid-line; only complete lines are dispatched
+        buffer = b""
+        while not self._stop_reader.is_set():
+            ser = self.ser
+            if not ser or not ser.is_open:
+                buffer = b""
+                self._stop_reader.wait(0.2)
+                continue
+
+            try:
+                buffer += ser.readline()
+            except Exception:
+                # port is being reconnected by _send()
+                buffer = b""
+                self._stop_reader.wait(0.2)
+                continue
+
+            while b"\n" in buffer:
+                raw, buffer = buffer.split(b"\n", 1)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    self._dispatch(line)
+
+    def _dispatch(self, line: str) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(line)
+            except Exception as e:
+                print(f"Light listener error: {e}")
+
     # ------------------------
     # Low-level send
     # ------------------------
@@ -121,9 +183,9 @@ class Light:
                 self.ser.write(data)
                 self.ser.flush()
             except Exception:
-                # Reconnect 1x
+                # Reconnect 1x, only the port: the reader keeps running
                 try:
-                    self.close()
+                    self.ser.close()
                 except Exception:
                     pass
                 self.connect()
@@ -0,0 +1,216 @@
+# audio_capture.py
+import threading
+from typing import Optional
+
+import numpy as np
+import pyaudio
+
+SAMPLE_RATE = 16000
+CHUNK = 1024           # frames per device read
+BUFFER_SECONDS = 10.0  # ring buffer length
+PREROLL_SECONDS = 0.5  # audio before the turn start that is decoded as well
+MAX_READ_ERRORS = 20   # consecutive device errors before the capture gives up
+
+
+class MicrophoneCapture:
+    """
+    Always-on microphone capture into a fixed-size ring buffer.
+
+    The device is opened once per session. A background thread writes
+    16 kHz int16 mono frames into a preallocated NumPy ring buffer, so a
+    turn can start decoding from a pre-roll window and the first syllables
+    spoken right after the LED turns green are not lost.
+
+    Positions are absolute frame counters (they never wrap), readers keep
+    their own position and call read().
+
+    `mute` is an optional event (see robot_state.ArmActivity): while it is
+    set, captured frames are replaced by silence, so arm servo noise never
+    reaches the recognizer and the timeline stays continuous.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        chunk: int = CHUNK,
+        buffer_seconds: float = BUFFER_SECONDS,
+        device_index: Optional[int] = None,
+        mute=None,
+    ):
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.device_index = device_index
+        self.mute = mute
+        self.muted_frames = 0
+
+        self.capacity = int(sample_rate * buffer_seconds)
+        self._ring = np.zeros(self.capacity, dtype=np.int16)
+        self._silence = np.zeros(chunk, dtype=np.int16)
+        self._written = 0  # total frames written since start()
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._pa: Optional[pyaudio.PyAudio] = None
+        self._stream = None
+
+    # ------------------------
+    # Device / thread
+    # ------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if self._stream is not None:
+            # the worker gave up on the device, reopen it
+            self.close()
+
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.chunk,
+        )
+        self._stream.start_stream()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        t = self._thread
+        if t and t.is_alive():
+            t.join(timeout=1.0)
+        self._thread = None
+
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+        with self._cond:
+            self._cond.notify_all()
+
+    def _worker(self) -> None:
+        errors = 0
+        while not self._stop.is_set():
+            try:
+                data = self._stream.read(self.chunk, exception_on_overflow=False)
+                errors = 0
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                errors += 1
+                if errors >= MAX_READ_ERRORS:
+                    # device is gone: wake the readers, start() reopens it
+                    print(f"❌ Microphone failed: {e}")
+                    self._stop.set()
+                    with self._cond:
+                        self._cond.notify_all()
+                    break
+                self._stop.wait(min(1.0, 0.01 * 2 ** errors))
+                continue
+
+            frames = np.frombuffer(data, dtype=np.int16)
+            if self.mute is not None and self.mute.is_set():
+                # arm is moving: keep time running, drop the audio
+                self.muted_frames += len(frames)
+                frames = self._silence[:len(frames)]
+            self._write(frames)
+
+    def _write(self, frames: np.ndarray) -> None:
+        n = len(frames)
+        if n > self.capacity:
+            frames = frames[-self.capacity:]
+            n = self.capacity
+
+        with self._cond:
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self._ring[start:start + first] = frames[:first]
+            if first < n:
+                self._ring[:n - first] = frames[first:]
+            self._written += n
+            self._cond.notify_all()
+
+    # ------------------------
+    # Reading
+    # ------------------------
+    @property
+    def position(self) -> int:
+        """
+        Absolute frame index of the next frame to be written.
+        """
+        with self._cond:
+            return self._written
+
+    def start_position(self, preroll: float = PREROLL_SECONDS) -> int:
+        """
+        Read position for a new turn, `preroll` seconds in the past.
+        """
+        with self._cond:
+            back = min(int(preroll * self.sample_rate), self._written, self.capacity)
+            return self._written - back
+
+    def read(self, pos: int, frames: int, timeout: Optional[float] = None) -> tuple[Optional[bytes], int]:
+        """
+        Blocks until `frames` frames after `pos` are available.
+
+        Returns (pcm_bytes, new_pos). If the reader fell further behind than
+        the buffer holds, it skips ahead to the oldest available frame.
+        Returns fewer frames on timeout and (None, pos) once the capture is
+        closed or the device failed, so readers can stop.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._written - pos >= frames or self._stop.is_set(),
+                timeout=timeout,
+            )
+            if self._stop.is_set():
+                return None, pos
+            oldest = self._written - self.capacity
+            if pos < oldest:
+                pos = oldest
+
+            n = min(frames, self._written - pos)
+            start = pos % self.capacity
+            first = min(n, self.capacity - start)
+            if first == n:
+                out = self._ring[start:start + n].tobytes()
+            else:
+                out = self._ring[start:].tobytes() + self._ring[:n - first].tobytes()
+
+        return out, pos + n
+
+
+_capture: Optional[MicrophoneCapture] = None
+_capture_lock = threading.Lock()
+
+
+def get_capture(mute=None) -> MicrophoneCapture:
+    """
+    Process-wide capture, started on first use and kept open for the session.
+    """
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = MicrophoneCapture(mute=mute)
+        elif mute is not None:
+            _capture.mute = mute
+        if not _capture.running:
+            _capture.start()
+        return _capture
@@ -0,0 +1,212 @@
+# autotune.py
+#
+# Finds engine settings for this machine.
+#
+# Runs the engine over a fixed set of positions for every combination of
+# Threads, Hash and movetime while background processes burn CPU (and hold
+# RAM) the way the speech worker and the arm/ROS2 stack do. The strongest
+# setting (most nodes per move) whose p95 move latency and engine RSS stay
+# within the limits is written to engine_profile.json, which the
+# controllers read at startup.
+#
+#   python3 autotune.py --p95 5 --ram-mb 512
+#   python3 autotune.py --threads 1,2,4 --hash 16,64,256 --movetime 1000,3000,5000
+#   python3 autotune.py --load 0.6,0.3 --ballast-mb 400    # speech + arm stand-in
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import multiprocessing as mp
+from typing import Optional
+
+import chess
+
+from engine import UciEngine
+
+STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+PROFILE_PATH = "engine_profile.json"
+
+# opening, middlegames and an endgame, the kinds of positions a robot game passes through
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N2N2/PP2BPPP/R2QKB1R w KQ - 0 9",
+    "r2q1rk1/1b2bppp/p2ppn2/1p6/3NP3/1BN1B3/PPP2PPP/R2Q1RK1 w - - 0 12",
+    "2r2rk1/pp3ppp/2n1p3/3pPn2/3P4/P1q2N2/2Q2PPP/R1B2RK1 w - - 0 18",
+    "8/5pk1/6p1/3R4/5P2/6PK/r7/8 b - - 0 45",
+]
+
+
+def load_profile(path: str = PROFILE_PATH) -> Optional[dict]:
+    """
+    Profile written by autotune, None if the machine has not been tuned.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ------------------------
+# Synthetic load
+# ------------------------
+def _load_worker(duty: float, ballast_mb: int, stop) -> None:
+    # touch every page so the ballast really occupies RAM
+    ballast = bytearray(ballast_mb * 1024 * 1024)
+    for i in range(0, len(ballast), 4096):
+        ballast[i] = 1
+
+    period = 0.01
+    while not stop.is_set():
+        end = time.perf_counter() + period * duty
+        while time.perf_counter() < end:
+            pass
+        time.sleep(period * (1.0 - duty))
+
+
+class SyntheticLoad:
+    """
+    One process per duty cycle (0..1 of a core), the first one also holds
+    `ballast_mb` of RAM.
+    """
+
+    def __init__(self, duties: list[float], ballast_mb: int = 0):
+        ctx = mp.get_context("spawn")
+        self._stop = ctx.Event()
+        self._procs = [
+            ctx.Process(target=_load_worker, args=(d, ballast_mb if i == 0 else 0, self._stop), daemon=True)
+            for i, d in enumerate(duties)
+        ]
+
+    def __enter__(self):
+        for p in self._procs:
+            p.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        for p in self._procs:
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    # Linux only; VmHWM is the peak resident set size
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# ------------------------
+# Benchmark
+# ------------------------
+async def measure(engine_path: str, threads: int, hash_mb: int, movetime: int, rounds: int) -> dict:
+    engine = UciEngine(engine_path, {"Threads": threads, "Hash": hash_mb})
+    await engine.start()
+    await engine.new_game()
+
+    latencies, nodes, depths = [], [], []
+    try:
+        for _ in range(rounds):
+            for fen in POSITIONS:
+                board = chess.Board(fen)
+                started = time.perf_counter()
+                result = await engine.search(board, timeout=movetime / 1000 * 3 + 1.0, movetime=movetime)
+                latencies.append(time.perf_counter() - started)
+                nodes.append(result.info.get("nodes", 0))
+                depths.append(result.info.get("depth", 0))
+        rss = peak_rss_mb(engine.pid) if engine.pid else None
+    finally:
+        await engine.quit()
+
+    latencies.sort()
+    return {
+        "Threads": threads,
+        "Hash": hash_mb,
+        "movetime": movetime,
+        "p95_s": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "mean_nodes": sum(nodes) / len(nodes),
+        "mean_depth": sum(depths) / len(depths),
+        "rss_mb": rss,
+    }
+
+
+def choose(results: list[dict], p95: float, ram_mb: float) -> Optional[dict]:
+    """
+    Most nodes per move among the settings within both limits
+    (fewer threads and less hash on ties).
+    """
+    ok = [
+        r for r in results
+        if r["p95_s"] <= p95 and (r["rss_mb"] is None or r["rss_mb"] <= ram_mb)
+    ]
+    if not ok:
+        return None
+    return max(ok, key=lambda r: (r["mean_nodes"], -r["Threads"], -r["Hash"]))
+
+
+def parse_list(text: str, kind=int) -> list:
+    return [kind(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Tune engine Threads/Hash/movetime for this machine")
+    parser.add_argument("--engine", default=STOCKFISH_PATH)
+    parser.add_argument("--threads", default="1,2,3,4")
+    parser.add_argument("--hash", default="16,64,128,256", help="MB")
+    parser.add_argument("--movetime", default="1000,2000,4000,8000", help="ms")
+    parser.add_argument("--p95", type=float, default=10.0, help="p95 move latency target in seconds")
+    parser.add_argument("--ram-mb", type=float, default=512, help="engine RSS ceiling")
+    parser.add_argument("--load", default="0.6,0.3", help="background CPU duty cycles (0 = none)")
+    parser.add_argument("--ballast-mb", type=int, default=0, help="RAM held by the background load")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the test positions")
+    parser.add_argument("--out", default=PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    threads = [t for t in parse_list(args.threads) if t <= cores]
+    duties = [d for d in parse_list(args.load, float) if d > 0]
+    grid = [(t, h, m) for t in threads for h in parse_list(args.hash) for m in parse_list(args.movetime)]
+
+    print(f"🔧 {len(grid)} settings, {len(POSITIONS) * args.rounds} positions each, load {duties or 'none'}")
+    results = []
+    with SyntheticLoad(duties, args.ballast_mb):
+        for t, h, m in grid:
+            r = asyncio.run(measure(args.engine, t, h, m, args.rounds))
+            results.append(r)
+            rss = f"{r['rss_mb']:.0f}MB" if r["rss_mb"] is not None else "?"
+            print(
+                f"• Threads {t:<2} Hash {h:<4} movetime {m:<5} "
+                f"p95 {r['p95_s']:.2f}s  depth {r['mean_depth']:.1f}  nodes {r['mean_nodes']:.0f}  rss {rss}"
+            )
+
+    best = choose(results, args.p95, args.ram_mb)
+    if best is None:
+        print(f"❌ No setting meets p95 <= {args.p95}s and RSS <= {args.ram_mb}MB, profile not written.")
+        sys.exit(1)
+
+    profile = {
+        **best,
+        "p95_target_s": args.p95,
+        "ram_mb_limit": args.ram_mb,
+        "load": duties,
+        "machine": f"{platform.node()} {platform.machine()} {cores} cores",
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    print(f"✅ Threads {best['Threads']}, Hash {best['Hash']} MB, movetime {best['movetime']} ms -> {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
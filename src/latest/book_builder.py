@@ -0,0 +1,225 @@
+# book_builder.py
+#
+# Offline self-play book builder, uses every core.
+#
+# Plays many short Stockfish-vs-Stockfish openings in parallel (one engine
+# per worker process). The first plies are picked at random among the
+# engine's MultiPV lines so the games spread over different openings, the
+# rest are best moves. The results are merged into a sorted Polyglot book
+# (and optionally position cache records) that the robot loads at startup,
+# so this search is done before the game instead of during it.
+#
+#   python3 book_builder.py --games 400 --plies 14 --depth 14 --out book.bin
+#   python3 book_builder.py --games 400 --depth 18 --cache position_cache.bin   # --cache needs depth 18+
+import os
+import sys
+import math
+import time
+import random
+import struct
+import asyncio
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import chess.polyglot
+
+from engine import UciEngine
+from position_cache import PositionCache
+
+STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+CACHE_DEPTH = 18  # chessmate_main.SEARCH_DEPTH, shallower cache entries are never served
+
+POLYGLOT = struct.Struct(">QHHI")
+PROMOTION_CODES = {None: 0, chess.KNIGHT: 1, chess.BISHOP: 2, chess.ROOK: 3, chess.QUEEN: 4}
+
+
+def polyglot_move(board: chess.Board, move: chess.Move) -> int:
+    """
+    Polyglot move encoding; castling is written as "king takes rook".
+    """
+    to_square = move.to_square
+    if board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+        to_square = chess.square(7 if board.is_kingside_castling(move) else 0, rank)
+
+    return (
+        chess.square_file(to_square)
+        | chess.square_rank(to_square) << 3
+        | chess.square_file(move.from_square) << 6
+        | chess.square_rank(move.from_square) << 9
+        | PROMOTION_CODES[move.promotion] << 12
+    )
+
+
+def write_book(path: str, counts: Counter) -> None:
+    """
+    Writes {(key, polyglot_move): weight} sorted by key, heaviest move first.
+
+    Weights above 16 bits are scaled down per position, so the move ratios
+    of all other positions stay exact.
+    """
+    top: dict = {}
+    for (key, _), weight in counts.items():
+        top[key] = max(top.get(key, 0), weight)
+
+    rows = sorted(counts.items(), key=lambda kv: (kv[0][0], -kv[1]))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for (key, move), weight in rows:
+            scale = 65535 / top[key] if top[key] > 65535 else 1
+            f.write(POLYGLOT.pack(key, move, max(1, int(weight * scale)), 0))
+    os.replace(tmp, path)
+
+
+# ------------------------
+# Worker process
+# ------------------------
+_loop = None
+_engine = None
+
+
+def _init_worker(engine_path: str, threads: int, hash_mb: int, multipv: int) -> None:
+    global _loop, _engine
+    _loop = asyncio.new_event_loop()
+    _engine = UciEngine(engine_path, {"Threads": threads, "Hash": hash_mb, "MultiPV": multipv})
+    _loop.run_until_complete(_engine.start())
+
+
+def _pick(lines: list, temperature: float, rng: random.Random) -> str:
+    """
+    Random MultiPV line, better scores more likely (softmax over centipawns).
+    """
+    scores = []
+    for line in lines:
+        kind, value = line.get("score", ("cp", 0))
+        scores.append(value if kind == "cp" else math.copysign(10000, value))
+    top = max(scores)
+    weights = [math.exp((s - top) / temperature) for s in scores]
+    return rng.choices(lines, weights)[0]["pv"][0]
+
+
+async def _play(seed: int, plies: int, random_plies: int, depth: int, temperature: float) -> list:
+    rng = random.Random(seed)
+    board = chess.Board()
+    await _engine.new_game()
+    records = []
+
+    for ply in range(plies):
+        if board.is_game_over():
+            break
+
+        result = await _engine.search(board, depth=depth)
+        if not result.bestmove:
+            break
+
+        move = result.bestmove
+        if ply < random_plies and len(result.lines) > 1:
+            move = _pick(result.lines, temperature, rng)
+
+        records.append((
+            chess.polyglot.zobrist_hash(board),
+            polyglot_move(board, chess.Move.from_uci(move)),
+            result.bestmove,
+            result.ponder,
+            result.info.get("score"),
+            result.info.get("depth", depth),
+        ))
+        board.push_uci(move)
+
+    return records
+
+
+def play_game(args) -> list:
+    return _loop.run_until_complete(_play(*args))
+
+
+# ------------------------
+# Main
+# ------------------------
+def build(
+    engine_path: str,
+    games: int,
+    plies: int,
+    random_plies: int,
+    depth: int,
+    jobs: int,
+    multipv: int = 4,
+    temperature: float = 40.0,
+    threads: int = 1,
+    hash_mb: int = 64,
+    seed: int = 0,
+) -> tuple[Counter, dict]:
+    """
+    Plays `games` openings on `jobs` engine processes.
+
+    Returns (book_counts, best) where book_counts maps (zobrist, polyglot_move)
+    to how often it was played and best maps zobrist -> (bestmove, ponder, score, depth).
+    """
+    counts: Counter = Counter()
+    best: dict = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(engine_path, threads, hash_mb, multipv),
+    ) as pool:
+        tasks = [(seed + i, plies, random_plies, depth, temperature) for i in range(games)]
+        for n, records in enumerate(pool.map(play_game, tasks), 1):
+            for key, move, bestmove, ponder, score, d in records:
+                counts[(key, move)] += 1
+                if key not in best or best[key][3] < d:
+                    best[key] = (bestmove, ponder, score, d)
+            if n % max(1, games // 20) == 0 or n == games:
+                print(f"• {n}/{games} games, {len(best)} positions, {time.perf_counter() - started:.0f}s")
+
+    return counts, best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book by parallel self-play")
+    parser.add_argument("--engine", default=STOCKFISH_PATH)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--plies", type=int, default=14, help="book depth in plies")
+    parser.add_argument("--random-plies", type=int, default=8, help="plies picked among MultiPV lines")
+    parser.add_argument("--depth", type=int, default=14, help="search depth per move")
+    parser.add_argument("--multipv", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=0, help="engine processes (0 = all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="book.bin", help="Polyglot book to write")
+    parser.add_argument("--merge", action="store_true", help="add to the weights of an existing book")
+    parser.add_argument("--cache", help="also write best moves into this position cache file")
+    args = parser.parse_args(argv)
+    if args.cache and args.depth < CACHE_DEPTH:
+        parser.error(f"--cache needs --depth {CACHE_DEPTH} or more, the controller ignores shallower entries")
+
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"🔧 {args.games} games x {args.plies} plies at depth {args.depth} on {jobs} engines")
+
+    counts, best = build(
+        args.engine, args.games, args.plies, args.random_plies, args.depth, jobs,
+        multipv=args.multipv, seed=args.seed,
+    )
+
+    if args.merge and os.path.exists(args.out):
+        with chess.polyglot.open_reader(args.out) as reader:
+            for entry in reader:
+                counts[(entry.key, entry.raw_move)] += entry.weight
+
+    write_book(args.out, counts)
+    print(f"📖 {args.out}: {len(counts)} entries, {len(best)} positions")
+
+    if args.cache:
+        # same settings string as the controller, so entries are found at game time
+        cache = PositionCache(args.cache)
+        for key, (bestmove, ponder, score, depth) in best.items():
+            if depth >= CACHE_DEPTH:
+                cache.put_hash(key, f"depth={CACHE_DEPTH}", bestmove, ponder, score, depth)
+        cache.save()
+        print(f"💾 {args.cache}: {cache.stats()['disk_entries']} positions")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,19 +1,57 @@
 import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
 import chess
-from stockfish import Stockfish
+import chess.polyglot
 
 from chess_translator import ChessCoordinateTranslator
 from move_chess_piece import Chess_Robot
-from speech_recognition import listen
+from robot_state import ArmActivity
+from speech_worker import SpeechWorker
+from move_grammar import SpokenMoveIndex, spoken_to_uci, rank_alternatives
 from Lights import Light
+from push_to_talk import PushToTalk
+from engine import UciEngine, Search, SearchResult, EngineError
+from position_cache import PositionCache
+from opening_book import OpeningBook
+from tablebase import EndgameTablebase
+from time_manager import TimeManager
+from autotune import load_profile
+from remote_engine import RemoteEngine, RacingEngine
+from difficulty import DIFFICULTIES, DEFAULT_DIFFICULTY
 
 STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+SEARCH_DEPTH = 18  # upper bound at full strength, the clock usually stops the search earlier
+GAME_BUDGET = 300.0  # seconds of engine time per game
+MAX_MOVE_TIME = 15.0  # seconds, the search is stopped and its best move used
+
+# stop early once the best move is the same for STABLE_ITERATIONS depths
+# (from STABLE_MIN_DEPTH on) and the score stays within STABLE_MARGIN_CP
+STABLE_ITERATIONS = 4
+STABLE_MARGIN_CP = 20
+STABLE_MIN_DEPTH = 8
+
+# while the arm executes the engine move: search the replies to the
+# SPECULATE_TOP_K most likely human moves (MultiPV scan), then ponder
+SPECULATE_TOP_K = 3
+SPECULATE_SCAN_MS = 500
+SPECULATE_REPLY_MS = 2000
+CACHE_PATH = "position_cache.bin"
+BOOK_PATH = "book.bin"  # Polyglot opening book
+ENGINE_PROFILE = "engine_profile.json"  # written by autotune.py
+# stockfish.online raced against the local engine, None = local only
+# (stand-in for testing: python3 fake_stockfish_online.py, then http://127.0.0.1:8765/api/s/v2.php)
+REMOTE_URL = None
+SYZYGY_PATH = "syzygy"  # directory with .rtbw/.rtbz files
 
 # start venv 
 # source venv/bin/activate
 
 # start chess:
 # python3 chessmate_main.py
+# python3 chessmate_main.py --level beginner   (beginner, casual, club, expert, full)
 
 # test without robot 
 # ros2 launch interbotix_xsarm_control xsarm_control.launch.py robot_model:=wx250s use_sim:=true
@@ -25,43 +63,109 @@ STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stock
 
 
 class AsyncChessRobotController:
-    GERMAN_NUMBERS = {
-        "eins": "1",
-        "zwei": "2",
-        "drei": "3",
-        "vier": "4",
-        "fünf": "5",
-        "sechs": "6",
-        "sieben": "7",
-        "acht": "8",
-    }
-
-    def __init__(self):
+    # accept the best n-best move if it leads the runner-up by this much
+    MIN_MARGIN = 0.3
+
+    def __init__(self, level: str = DEFAULT_DIFFICULTY):
+        self.level = DIFFICULTIES[level]
         self.loop = asyncio.get_event_loop()
         self.board = chess.Board()
         self.translator = ChessCoordinateTranslator()
 
-        self.robot = Chess_Robot()
-        self.robot.startup()
+        # shared between the arm and the speech pipeline: mute the mic while moving
+        self.arm = ArmActivity()
 
-        self.stockfish = Stockfish(
-            path=STOCKFISH_PATH,
-            depth=18,
-            parameters={
-                "Threads": 2,
-                "Minimum Thinking Time": 30,
-            },
-        )
+        self.robot = Chess_Robot(activity=self.arm)
+        self.robot.startup()
+        # arm motions run here so the event loop (engine, speech) keeps going meanwhile
+        self._arm_executor = ThreadPoolExecutor(max_workers=1)
+
+        # Threads/Hash and the longest move time measured for this machine by autotune.py
+        profile = load_profile(ENGINE_PROFILE) or {}
+        options = {
+            "Threads": 2,
+            "Minimum Thinking Time": 30,
+            "Ponder": True,
+        }
+        options.update({k: profile[k] for k in ("Threads", "Hash") if k in profile})
+        max_move_time = MAX_MOVE_TIME
+        if "movetime" in profile:
+            max_move_time = min(MAX_MOVE_TIME, profile["movetime"] / 1000)
+
+        # difficulty: strength options plus fewer threads/less time for weaker levels
+        options = self.level.engine_options(options)
+        max_move_time = min(max_move_time, self.level.max_move_time)
+        print(f"⚙️ Level {self.level.name}: Threads {options['Threads']}, Hash {options.get('Hash')} MB, "
+              f"max {max_move_time:.1f}s per move")
+
+        # started in start(), runs for the whole game
+        self.engine = UciEngine(STOCKFISH_PATH, options)
+        self.race = None
+        if REMOTE_URL and self.level.remote:
+            self.race = RacingEngine(self.engine, RemoteEngine(REMOTE_URL), deadline=max_move_time)
+
+        # thinking time per move from the remaining game budget
+        self.clock = TimeManager(GAME_BUDGET, max_move_time=max_move_time)
+        self.early_exit = {
+            "stable_iterations": STABLE_ITERATIONS,
+            "margin": STABLE_MARGIN_CP,
+            "min_depth": STABLE_MIN_DEPTH,
+        }
+        self.early_exits = 0
+        self.time_saved = 0.0
+
+        # search on the predicted human reply: (expected uci, search)
+        self._ponder: tuple[str, Search] | None = None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+        # engine replies searched ahead for likely human moves: zobrist -> result
+        self._speculation: asyncio.Task | None = None
+        self._speculative: dict[int, SearchResult] = {}
+        self.speculative_hits = 0
+
+        # book moves first, the engine only once the game leaves the book
+        self.book = OpeningBook(BOOK_PATH)
+
+        # perfect endgame play once few enough pieces are left
+        self.tablebase = EndgameTablebase(SYZYGY_PATH)
+
+        # best moves of positions seen before (this game or earlier ones)
+        self.cache = PositionCache(CACHE_PATH)
+        self.search_settings = f"depth={SEARCH_DEPTH}"
+        if self.level.name != DEFAULT_DIFFICULTY:
+            self.search_settings = f"level={self.level.name}"
+        # timed, early-exit and speculative searches can stop short of the
+        # key's depth; only answers that reached it are stored and served
+        self.cache_depth = min(SEARCH_DEPTH, self.level.depth)
+        # a cached weak move would be repeated in every game instead of varying
+        self.use_cache = not self.level.randomized
 
         self.lights = Light()
 
+        # ESP32 button: once pressed, speech is only decoded while it is held
+        self.ptt = PushToTalk(self.lights)
+
+        # Vosk model and microphone live in their own process for the whole session
+        self.speech = SpeechWorker(mute=self.arm.event, talk=self.ptt.gate)
+        self.speech.start()
+
+        # spoken-move index / grammar for the next human turn: (fen, future)
+        self._index: tuple[str, asyncio.Future] | None = None
+
+    async def start(self) -> None:
+        await self.engine.start()
+        await self.engine.new_game()
+
     # ------------------------------------------------------------------ #
     # Robot control
     # ------------------------------------------------------------------ #
 
     async def execute_robot_move(self, uci_move: str) -> None:
         move = self.translator.parse_chess_move(uci_move)
-        self.robot.robot_move(
+        await self.loop.run_in_executor(
+            self._arm_executor,
+            self.robot.robot_move,
             move["from"]["x"],
             move["to"]["x"],
             move["from"]["y"],
@@ -71,7 +175,9 @@ class AsyncChessRobotController:
 
     async def execute_robot_take(self, uci_move: str) -> None:
         move = self.translator.parse_chess_move(uci_move)
-        self.robot.robot_take(
+        await self.loop.run_in_executor(
+            self._arm_executor,
+            self.robot.robot_take,
             move["from"]["x"],
             move["to"]["x"],
             move["from"]["y"],
@@ -113,41 +219,107 @@ class AsyncChessRobotController:
     # ------------------------------------------------------------------ #
 
     def spoken_to_uci(self, spoken: str) -> str | None:
-        tokens = spoken.lower().split()
-        cleaned = []
+        return spoken_to_uci(spoken)
+
+    def pick_alternative(self, index: SpokenMoveIndex, alternatives: list) -> str | None:
+        """
+        Best legal move of an n-best list, if its margin is high enough.
+        """
+        ranked = rank_alternatives(index, alternatives)
+        if not ranked:
+            return None
+
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        best, score = ranked[0]
+        if score - runner_up < self.MIN_MARGIN:
+            print(f"• Not sure: {ranked[:3]}")
+            return None
 
-        for t in tokens:
-            if t in "abcdefgh":
-                cleaned.append(t)
-            elif t in self.GERMAN_NUMBERS:
-                cleaned.append(self.GERMAN_NUMBERS[t])
+        return best
 
-        return "".join(cleaned) if len(cleaned) == 4 else None
+    def print_speech_stats(self) -> None:
+        turn = self.speech.last_turn
+        if not turn:
+            return
+        print(
+            f"• Recognizer setup {turn['last_setup_s'] * 1000:.1f} ms "
+            f"(model load {turn['model_load_s']:.2f}s, once)"
+        )
+        if turn["vad_skipped"] is not None:
+            print(f"• VAD skipped {turn['vad_skipped']:.0%} of frames")
+
+    def prepare_index(self, board: chess.Board) -> None:
+        """
+        Builds the spoken-move index (and grammar) for `board` in the background.
+        """
+        board = board.copy(stack=False)
+        future = self.loop.run_in_executor(None, SpokenMoveIndex, board)
+        self._index = (board.fen(), future)
+
+    async def get_index(self) -> SpokenMoveIndex:
+        fen = self.board.fen()
+        if self._index is None or self._index[0] != fen:
+            self.prepare_index(self.board)
+        return await self._index[1]
 
     async def get_user_move_speech(self) -> str | None:
+        index = await self.get_index()
+        grammar = index.grammar()
+        print(f"• Grammar: {len(index)} phrases")
+
         while True:
+            if self.ptt.gate.active:
+                print("🎤 Hold the button and say your move...")
+            else:
+                print("🎤 Please say your move...")
+            self.lights.speech_ready()
 
-            spoken = await self.loop.run_in_executor(None, listen)
-            uci = self.spoken_to_uci(spoken)
+            hypotheses = self.speech.hypotheses(grammar=grammar)
+            failed = None
 
-            if not uci:
+            try:
+                async for spoken, final, alternatives in hypotheses:
+                    # accept as soon as a (partial) hypothesis names a unique legal move
+                    legal = index.lookup(spoken)
+                    if legal:
+                        print(f"• Recognized: {spoken}{'' if final else ' (partial)'}")
+                        return legal
+
+                    if not final:
+                        continue
+
+                    print("• Recognized:", spoken)
+
+                    # top transcript is not a legal move, try the other hypotheses
+                    legal = self.pick_alternative(index, alternatives)
+                    if legal:
+                        print(f"• Using n-best alternative: {legal}")
+                        return legal
+
+                    if len(index.candidates(spoken)) > 1:
+                        print(f"❌ Ambiguous: {sorted(index.candidates(spoken))}")
+                    else:
+                        failed = self.spoken_to_uci(spoken)
+                    break
+            finally:
+                await hypotheses.aclose()
+                self.print_speech_stats()
+
+            if not failed:
                 print("❌ Could not understand move. Please repeat.")
                 self.lights.unknown()
                 await asyncio.sleep(2.5)
                 continue
 
             try:
-                move = chess.Move.from_uci(uci)
+                chess.Move.from_uci(failed)
             except (ValueError, chess.InvalidMoveError):
-                print(f"❌ Invalid UCI format: {uci}")
+                print(f"❌ Invalid UCI format: {failed}")
                 self.lights.illegal()
                 await asyncio.sleep(2.5)
                 continue
 
-            if move in self.board.legal_moves:
-                return uci
-
-            print(f"❌ Illegal move: {uci}")
+            print(f"❌ Illegal move: {failed}")
             self.lights.illegal()
             await asyncio.sleep(2.5)
 
@@ -155,12 +327,192 @@ class AsyncChessRobotController:
     # Stockfish
     # ------------------------------------------------------------------ #
 
-    async def get_stockfish_move(self) -> str | None:
-        def _get_best():
-            self.stockfish.set_fen_position(self.board.fen())
-            return self.stockfish.get_best_move()
+    async def start_pondering(self, board: chess.Board, ponder: str | None) -> None:
+        """
+        Lets the engine think on the human's time about the predicted reply
+        to the engine move already on `board`.
+        """
+        if not ponder or chess.Move.from_uci(ponder) not in board.legal_moves:
+            return
+
+        board.push(chess.Move.from_uci(ponder))
+        limits = self.search_limits(self.clock.allocate(board))
+        board.pop()
+
+        search = await self.engine.ponder(board, chess.Move.from_uci(ponder), **limits)
+        self._ponder = (ponder, search)
+
+    def search_limits(self, seconds: float) -> dict:
+        """
+        go limits: the clock's allocation plus the level's depth and node caps.
+        """
+        limits = {"depth": min(SEARCH_DEPTH, self.level.depth), **self.clock.limits(seconds)}
+        if self.level.nodes:
+            limits["nodes"] = min(limits.get("nodes", self.level.nodes), self.level.nodes)
+        return limits
+
+    async def likely_replies(self, board: chess.Board, predicted: str | None) -> list[chess.Move]:
+        """
+        Top-K human replies on `board` from a short MultiPV search, the
+        engine's predicted (ponder) move first.
+        """
+        await self.engine.set_option("MultiPV", SPECULATE_TOP_K)
+        try:
+            scan = await self.engine.search(board, timeout=SPECULATE_SCAN_MS / 1000 + 1.0, movetime=SPECULATE_SCAN_MS)
+        finally:
+            await self.engine.set_option("MultiPV", 1)
+
+        replies = [predicted] if predicted else []
+        replies += [line["pv"][0] for line in scan.lines if line.get("pv")]
+        moves = []
+        for uci in dict.fromkeys(replies):
+            move = chess.Move.from_uci(uci)
+            if move in board.legal_moves:
+                moves.append(move)
+        return moves[:SPECULATE_TOP_K]
+
+    async def speculate(self, board: chess.Board, predicted: str | None) -> None:
+        """
+        Runs while the arm executes the engine move on `board`: searches the
+        engine reply to each likely human move and keeps the results, then
+        ponders on the predicted move for the rest of the human's time.
+        Cancelled by search_best() once the human has moved.
+        """
+        self._speculative.clear()
+        try:
+            replies = await self.likely_replies(board, predicted)
+            for reply in replies:
+                after = board.copy()
+                after.push(reply)
+                if after.is_game_over():
+                    continue
+                result = await self.engine.search(
+                    after, timeout=SPECULATE_REPLY_MS / 1000 + 1.0, movetime=SPECULATE_REPLY_MS,
+                )
+                if result.bestmove and not result.stopped:
+                    self._speculative[chess.polyglot.zobrist_hash(after)] = result
+
+            print(f"• Speculated {len(self._speculative)} replies: {[m.uci() for m in replies]}")
+            await self.start_pondering(board, replies[0].uci() if replies else predicted)
+        except (EngineError, asyncio.TimeoutError) as e:
+            print(f"⚠️ Speculation failed: {e}")
+
+    async def stop_speculation(self) -> None:
+        task, self._speculation = self._speculation, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
-        best = await self.loop.run_in_executor(None, _get_best)
+    def cached_result(self) -> SearchResult | None:
+        if not self.use_cache:
+            return None
+        entry = self.cache.get(self.board, self.search_settings)
+        if entry is None or entry.depth < self.cache_depth:
+            return None
+        if chess.Move.from_uci(entry.bestmove) not in self.board.legal_moves:
+            return None
+        return SearchResult(
+            bestmove=entry.bestmove,
+            ponder=entry.ponder,
+            info={"score": entry.score, "depth": entry.depth},
+        )
+
+    async def stop_pondering(self) -> None:
+        if self._ponder is not None:
+            await self._ponder[1].stop()
+            self._ponder = None
+
+    async def search_best(self) -> SearchResult:
+        """
+        Answers from the endgame tablebase, the opening book or the position
+        cache if possible.
+        Otherwise converts a matching ponder search into the real one, uses
+        a speculative result, or searches from scratch.
+        """
+        await self.stop_speculation()
+
+        tb = self.tablebase.choose(self.board) if self.level.tablebase else None
+        if tb is not None:
+            print(f"• Tablebase move: {tb} (wdl {self.tablebase.last_wdl}, dtz {self.tablebase.last_dtz})")
+            await self.stop_pondering()
+            return SearchResult(bestmove=tb)
+
+        book = None
+        if self.level.book_plies is None or self.board.ply() < self.level.book_plies:
+            book = self.book.choose(self.board)
+        if book is not None:
+            print(f"• Book move: {book}")
+            await self.stop_pondering()
+            return SearchResult(bestmove=book)
+
+        cached = self.cached_result()
+        if cached is not None:
+            print(f"• Cache hit: {cached.bestmove} {cached.info['score']}")
+            await self.stop_pondering()
+            return cached
+
+        result = await self._search_engine()
+        deep_enough = result.info.get("depth", 0) >= self.cache_depth
+        if self.use_cache and result.bestmove and (not result.stopped or result.early_exit) and deep_enough:
+            self.cache.put(
+                self.board, self.search_settings, result.bestmove,
+                result.ponder, result.info.get("score"), result.info.get("depth", 0),
+            )
+        return result
+
+    async def _search_engine(self) -> SearchResult:
+        seconds = self.clock.allocate(self.board)
+        result = await self._run_search(seconds)
+        self.clock.record(result.elapsed, seconds, result.info.get("nps"))
+        if result.early_exit:
+            saved = max(0.0, seconds - result.elapsed)
+            self.early_exits += 1
+            self.time_saved += saved
+            print(f"• Early exit at depth {result.info.get('depth')}: {saved:.2f}s saved")
+        print(
+            f"• Clock: {result.elapsed:.2f}s of {seconds:.2f}s allotted, "
+            f"{self.clock.remaining:.0f}s left in the game"
+        )
+        return result
+
+    async def _run_search(self, seconds: float) -> SearchResult:
+        timeout = self.clock.timeout(seconds)
+        ponder, self._ponder = self._ponder, None
+        played = self.board.peek().uci() if self.board.move_stack else None
+
+        if ponder is not None:
+            expected, search = ponder
+            if expected == played and not search.done:
+                self.ponder_hits += 1
+                print(f"• Ponder hit ({expected})")
+                await search.ponderhit()
+                return await search.wait_stable(timeout, **self.early_exit)
+
+            self.ponder_misses += 1
+            print(f"• Ponder miss (expected {expected}, got {played})")
+            await search.stop()
+
+        speculative = self._speculative.pop(chess.polyglot.zobrist_hash(self.board), None)
+        self._speculative.clear()
+        if speculative is not None:
+            self.speculative_hits += 1
+            print(f"• Speculative hit ({played})")
+            # searched on the arm's time, nothing to charge to the clock
+            return replace(speculative, elapsed=0.0)
+
+        searcher = self.race or self.engine
+        return await searcher.search(
+            self.board, timeout=timeout, early_exit=self.early_exit,
+            **self.search_limits(seconds),
+        )
+
+    async def get_stockfish_move(self) -> str | None:
+        result = await self.search_best()
+        print(f"• Engine time: {result.elapsed:.2f}s")
+        best = result.bestmove
         if not best:
             return None
 
@@ -168,6 +520,15 @@ class AsyncChessRobotController:
         if move not in self.board.legal_moves:
             return None
 
+        # index for the human reply is built while the arm executes this move
+        after = self.board.copy()
+        after.push(move)
+        self.prepare_index(after.copy(stack=False))
+
+        # engine works on the likely replies meanwhile too (not on the low-power levels)
+        if self.level.ponder:
+            self._speculation = asyncio.create_task(self.speculate(after, result.ponder))
+
         print(f"🤖 Stockfish plays: {best}")
         return best
 
@@ -182,8 +543,23 @@ class AsyncChessRobotController:
         except Exception:
             pass
 
+        await self.stop_speculation()
+        self.speech.close()
         self.robot.shutdown()
-        del self.stockfish
+        self._arm_executor.shutdown()
+        await self.engine.quit()
+        if self.race is not None:
+            self.race.remote.close()
+            print(f"📊 Engine race: {self.race.stats()}")
+
+        self.book.close()
+        self.tablebase.close()
+        self.cache.save()
+        print(f"📊 Position cache: {self.cache.stats()}")
+        print(f"📊 Engine clock: {self.clock.stats()}")
+        print(f"📊 Early exits: {self.early_exits}, {self.time_saved:.1f}s saved")
+        print(f"📊 Ponder hits: {self.ponder_hits}, misses: {self.ponder_misses}, "
+              f"speculative hits: {self.speculative_hits}")
 
 
 def print_board(board: chess.Board):
@@ -195,14 +571,17 @@ def print_board(board: chess.Board):
     print("-" * 33)
 
 
-async def main():
-    controller = AsyncChessRobotController()
+async def main(level: str = DEFAULT_DIFFICULTY):
+    controller = AsyncChessRobotController(level)
     move_number = 1
 
     print("\n🎮 ASYNC CHESS ROBOT GAME")
+    print(f"Level: {controller.level.name} ({controller.level.description})")
     print("You play White. Say your moves.\n")
 
     try:
+        await controller.start()
+
         while not controller.board.is_game_over():
             print_board(controller.board)
             print(f"\n📋 MOVE {move_number}")
@@ -233,4 +612,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Voice-controlled chess robot")
+    parser.add_argument(
+        "--level",
+        choices=list(DIFFICULTIES),
+        default=DEFAULT_DIFFICULTY,
+        help=", ".join(f"{d.name}: {d.description}" for d in DIFFICULTIES.values()),
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.level))
@@ -0,0 +1,87 @@
+# difficulty.py
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class Difficulty:
+    """
+    Named engine strength.
+
+    Weaker levels are limited both in play (Skill Level or UCI_Elo, a
+    shallower opening book, no full-strength remote engine) and in
+    work: fewer threads, a small hash, node/time/depth limits and no
+    pondering or speculative search on the human's time, so the engine
+    really burns less CPU and battery instead of searching fully and then
+    picking a worse move.
+    """
+
+    name: str
+    description: str
+    options: dict = field(default_factory=dict)  # UCI options, override the defaults
+    threads: Optional[int] = None   # cap, None = as tuned
+    hash_mb: Optional[int] = None   # cap in MB, None = as tuned
+    depth: int = 18
+    nodes: Optional[int] = None     # per move
+    max_move_time: float = 15.0     # seconds
+    ponder: bool = True             # also enables the speculative search
+    tablebase: bool = True          # perfect endgames are no fun for beginners
+    remote: bool = True             # race the full-strength remote engine (REMOTE_URL)
+    book_plies: Optional[int] = None  # book moves only in the first N plies, None = whole book
+
+    def engine_options(self, base: dict) -> dict:
+        """
+        `base` (defaults and the autotune profile) with this level applied;
+        threads and hash are capped, never raised above the tuned values.
+        """
+        options = dict(base)
+        if self.threads is not None:
+            options["Threads"] = min(options.get("Threads", self.threads), self.threads)
+        if self.hash_mb is not None:
+            options["Hash"] = min(options.get("Hash", self.hash_mb), self.hash_mb)
+        options["Ponder"] = self.ponder
+        options.update(self.options)
+        return options
+
+    @property
+    def randomized(self) -> bool:
+        """
+        True if the engine picks its weaker move at random on every search
+        (Skill Level, UCI_LimitStrength); results must not be replayed then.
+        """
+        return "Skill Level" in self.options or bool(self.options.get("UCI_LimitStrength"))
+
+
+DIFFICULTIES = {
+    d.name: d for d in (
+        Difficulty(
+            "beginner", "first games, makes obvious mistakes",
+            options={"Skill Level": 0},
+            threads=1, hash_mb=16, depth=6, nodes=20_000, max_move_time=1.0,
+            ponder=False, tablebase=False, remote=False, book_plies=0,
+        ),
+        Difficulty(
+            "casual", "plays sensibly, misses tactics",
+            options={"Skill Level": 5},
+            threads=1, hash_mb=16, depth=10, nodes=150_000, max_move_time=2.0,
+            ponder=False, tablebase=False, remote=False, book_plies=4,
+        ),
+        Difficulty(
+            "club", "about 1800 Elo",
+            options={"UCI_LimitStrength": True, "UCI_Elo": 1800},
+            threads=1, hash_mb=64, depth=14, nodes=1_000_000, max_move_time=5.0,
+            ponder=False, remote=False, book_plies=10,
+        ),
+        Difficulty(
+            "expert", "about 2400 Elo",
+            options={"UCI_LimitStrength": True, "UCI_Elo": 2400},
+            threads=2, hash_mb=128, depth=16, max_move_time=10.0,
+            remote=False,
+        ),
+        Difficulty(
+            "full", "full strength, uses the tuned engine settings",
+            depth=18, max_move_time=15.0,
+        ),
+    )
+}
+DEFAULT_DIFFICULTY = "full"
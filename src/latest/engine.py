@@ -0,0 +1,429 @@
+# engine.py
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import chess
+
+STOP_GRACE = 2.0  # seconds to wait for "bestmove" after "stop"
+MATE_CP = 10000   # mate scores as centipawns when comparing evaluations
+
+
+class EngineError(Exception):
+    pass
+
+
+def parse_info(line: str) -> dict:
+    """
+    Parses a UCI "info ..." line.
+
+    "info depth 12 score cp 34 nodes 1000 pv e2e4 e7e5" ->
+    {"depth": 12, "score": ("cp", 34), "nodes": 1000, "pv": ["e2e4", "e7e5"]}
+    """
+    tokens = line.split()[1:]
+    info: dict = {}
+    i = 0
+    while i < len(tokens):
+        key = tokens[i]
+        if key == "string":
+            info["string"] = " ".join(tokens[i + 1:])
+            break
+        if key == "pv":
+            info["pv"] = tokens[i + 1:]
+            break
+        if key == "score" and i + 2 < len(tokens):
+            info["score"] = (tokens[i + 1], int(tokens[i + 2]))
+            i += 3
+            if i < len(tokens) and tokens[i] in ("lowerbound", "upperbound"):
+                info["bound"] = tokens[i]
+                i += 1
+            continue
+        if key in ("depth", "seldepth", "multipv", "nodes", "nps", "time", "hashfull", "tbhits") \
+                and i + 1 < len(tokens):
+            try:
+                info[key] = int(tokens[i + 1])
+            except ValueError:
+                pass
+            i += 2
+            continue
+        if key == "currmove" and i + 1 < len(tokens):
+            info[key] = tokens[i + 1]
+            i += 2
+            continue
+        i += 1
+    return info
+
+
+@dataclass
+class SearchResult:
+    bestmove: Optional[str]
+    ponder: Optional[str] = None
+    info: dict = field(default_factory=dict)  # last info line with a pv
+    elapsed: float = 0.0
+    stopped: bool = False                     # ended by stop()/timeout
+    lines: list = field(default_factory=list)  # last info per MultiPV line, best first
+    early_exit: bool = False                  # stopped by wait_stable()
+
+
+class Search:
+    """
+    Handle of one running "go".
+
+    await wait() for the SearchResult, iterate infos() for streaming
+    "info" lines and call stop() to cancel.
+    """
+
+    def __init__(self, engine: "UciEngine", ponder: bool = False):
+        self.engine = engine
+        self.pondering = ponder
+        self.started = time.perf_counter()
+        self.last_info: dict = {}
+        self.lines: dict[int, dict] = {}
+        self.stopped = False
+        self.early_exit = False
+
+        self._done: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._infos: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    def _on_info(self, info: dict) -> None:
+        if "pv" in info:
+            self.lines[info.get("multipv", 1)] = info
+            if info.get("multipv", 1) == 1:
+                self.last_info = info
+        self._infos.put_nowait(info)
+
+    def _on_bestmove(self, bestmove: Optional[str], ponder: Optional[str]) -> None:
+        if self._done.done():
+            return
+        self._done.set_result(SearchResult(
+            bestmove=bestmove,
+            ponder=ponder,
+            info=self.last_info,
+            elapsed=time.perf_counter() - self.started,
+            stopped=self.stopped,
+            early_exit=self.early_exit,
+            lines=[self.lines[k] for k in sorted(self.lines)],
+        ))
+        self._infos.put_nowait(None)
+
+    def _on_exit(self) -> None:
+        if not self._done.done():
+            self._done.set_exception(EngineError("engine process exited"))
+            self._infos.put_nowait(None)
+
+    async def infos(self):
+        """
+        Async generator over parsed "info" dicts until the search ends.
+        """
+        while True:
+            info = await self._infos.get()
+            if info is None:
+                return
+            yield info
+
+    async def ponderhit(self) -> None:
+        """
+        The predicted move was played: the ponder search becomes the real one.
+        """
+        if self.pondering and not self._done.done():
+            self.pondering = False
+            self.started = time.perf_counter()
+            await self.engine.send("ponderhit")
+
+    async def stop(self) -> SearchResult:
+        if not self._done.done():
+            self.stopped = True
+            await self.engine.send("stop")
+        return await asyncio.wait_for(asyncio.shield(self._done), STOP_GRACE)
+
+    async def wait(self, timeout: Optional[float] = None) -> SearchResult:
+        """
+        Waits for "bestmove". After `timeout` seconds the search is stopped
+        and the best move found so far is returned. Cancelling the waiting
+        task also stops the search.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._done), timeout)
+        except asyncio.TimeoutError:
+            return await self.stop()
+        except asyncio.CancelledError:
+            if not self._done.done():
+                self.stopped = True
+                await self.engine.send("stop")
+            raise
+
+    async def wait_stable(
+        self,
+        timeout: Optional[float] = None,
+        stable_iterations: int = 4,
+        margin: int = 20,
+        min_depth: int = 8,
+    ) -> SearchResult:
+        """
+        Like wait(), but stops the search early once the best move has been
+        the same for `stable_iterations` completed depths (from `min_depth`
+        on) and the score moved by at most `margin` centipawns over them.
+        """
+        watcher = asyncio.create_task(self._watch_stability(stable_iterations, margin, min_depth))
+        try:
+            return await self.wait(timeout)
+        finally:
+            watcher.cancel()
+
+    async def _watch_stability(self, stable_iterations: int, margin: int, min_depth: int) -> None:
+        history: list[tuple[int, str, int]] = []  # (depth, best move, score) per iteration
+        async for info in self.infos():
+            if "pv" not in info or "bound" in info or info.get("multipv", 1) != 1:
+                continue
+
+            kind, value = info.get("score", ("cp", 0))
+            score = value if kind == "cp" else int(math.copysign(MATE_CP, value))
+            entry = (info.get("depth", 0), info["pv"][0], score)
+            if history and history[-1][0] == entry[0]:
+                history[-1] = entry
+            else:
+                history.append(entry)
+
+            window = history[-stable_iterations:]
+            if (
+                not self.pondering
+                and len(window) == stable_iterations
+                and window[0][0] >= min_depth
+                and len({move for _, move, _ in window}) == 1
+                and max(s for *_, s in window) - min(s for *_, s in window) <= margin
+            ):
+                self.early_exit = True
+                await self.stop()
+                return
+
+
+class UciEngine:
+    """
+    Persistent UCI session over asyncio subprocess pipes.
+
+    Replaces the synchronous `stockfish` wrapper in the thread pool: searches
+    are awaitable, can be cancelled with "stop", stream their "info" lines
+    and honour per-search timeouts without blocking a pool thread.
+
+    With `incremental` (the default) positions are sent as
+    "position startpos moves ..." from the board's move stack, so the
+    engine keeps the game history for repetition detection and sees each
+    position as a continuation of the last one. incremental=False sends a
+    bare FEN like the old wrapper did.
+    """
+
+    def __init__(self, path: str, options: Optional[dict] = None, incremental: bool = True):
+        self.path = path
+        self.options = dict(options or {})
+        self.incremental = incremental
+        self.id: dict = {}
+        self.available_options: set[str] = set()
+
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._uciok: Optional[asyncio.Future] = None
+        self._readyok: Optional[asyncio.Future] = None
+        self._search: Optional[Search] = None
+        self._lock = asyncio.Lock()
+
+    # ------------------------
+    # Process
+    # ------------------------
+    @property
+    def pid(self) -> Optional[int]:
+        return self._proc.pid if self._proc is not None else None
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+
+        self._proc = await asyncio.create_subprocess_exec(
+            self.path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        loop = asyncio.get_running_loop()
+        self._uciok = loop.create_future()
+        self._reader = asyncio.create_task(self._read_loop())
+
+        await self.send("uci")
+        await asyncio.wait_for(self._uciok, 10.0)
+
+        for name, value in self.options.items():
+            await self.set_option(name, value)
+        await self.is_ready()
+
+    async def quit(self) -> None:
+        if not self.running:
+            return
+        try:
+            await self.stop()
+        except Exception:
+            pass
+        try:
+            await self.send("quit")
+            await asyncio.wait_for(self._proc.wait(), 2.0)
+        except Exception:
+            self._proc.kill()
+        if self._reader is not None:
+            self._reader.cancel()
+
+    async def send(self, line: str) -> None:
+        if not self.running:
+            raise EngineError("engine is not running")
+        self._proc.stdin.write((line + "\n").encode())
+        await self._proc.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                raw = await self._proc.stdout.readline()
+                if not raw:
+                    break
+                self._on_line(raw.decode(errors="replace").strip())
+        finally:
+            if self._search is not None:
+                self._search._on_exit()
+
+    def _on_line(self, line: str) -> None:
+        if not line:
+            return
+        cmd = line.split(maxsplit=1)[0]
+
+        if cmd == "info":
+            if self._search is not None:
+                self._search._on_info(parse_info(line))
+        elif cmd == "bestmove":
+            parts = line.split()
+            best = parts[1] if len(parts) > 1 and parts[1] not in ("(none)", "0000") else None
+            ponder = parts[3] if len(parts) > 3 and parts[2] == "ponder" else None
+            if self._search is not None:
+                self._search._on_bestmove(best, ponder)
+        elif cmd == "readyok":
+            if self._readyok is not None and not self._readyok.done():
+                self._readyok.set_result(True)
+        elif cmd == "uciok":
+            if self._uciok is not None and not self._uciok.done():
+                self._uciok.set_result(True)
+        elif cmd == "id":
+            parts = line.split(maxsplit=2)
+            if len(parts) == 3:
+                self.id[parts[1]] = parts[2]
+        elif cmd == "option":
+            # option name <Name with spaces> type ...
+            if " name " in line and " type " in line:
+                self.available_options.add(line.split(" name ", 1)[1].split(" type ", 1)[0])
+
+    # ------------------------
+    # Commands
+    # ------------------------
+    async def is_ready(self, timeout: float = 10.0) -> None:
+        self._readyok = asyncio.get_running_loop().create_future()
+        await self.send("isready")
+        await asyncio.wait_for(self._readyok, timeout)
+
+    async def set_option(self, name: str, value) -> None:
+        if self.available_options and name not in self.available_options:
+            return
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        self.options[name] = value
+        await self.send(f"setoption name {name} value {value}")
+
+    async def new_game(self) -> None:
+        await self.send("ucinewgame")
+        await self.is_ready()
+
+    async def stop(self) -> None:
+        """
+        Stops the running search, if any (its result is discarded).
+        """
+        if self._search is not None and not self._search.done:
+            await self._search.stop()
+
+    def position_command(self, board: chess.Board) -> str:
+        if not self.incremental:
+            return f"position fen {board.fen()}"
+
+        root = board.root().fen()
+        command = "position startpos" if root == chess.STARTING_FEN else f"position fen {root}"
+        if board.move_stack:
+            command += " moves " + " ".join(move.uci() for move in board.move_stack)
+        return command
+
+    async def position(self, board: chess.Board) -> None:
+        await self.stop()
+        await self.send(self.position_command(board))
+
+    async def go(
+        self,
+        depth: Optional[int] = None,
+        movetime: Optional[int] = None,
+        nodes: Optional[int] = None,
+        ponder: bool = False,
+        infinite: bool = False,
+        **limits,
+    ) -> Search:
+        """
+        Starts a search and returns its Search handle.
+
+        Extra `limits` are passed through as UCI go parameters
+        (wtime, btime, winc, binc, movestogo, mate).
+        """
+        async with self._lock:
+            await self.stop()
+
+            parts = ["go"]
+            if ponder:
+                parts.append("ponder")
+            if infinite:
+                parts.append("infinite")
+            for key, value in (("depth", depth), ("movetime", movetime), ("nodes", nodes), *limits.items()):
+                if value is not None:
+                    parts += [key, str(int(value))]
+
+            self._search = Search(self, ponder=ponder)
+            await self.send(" ".join(parts))
+            return self._search
+
+    async def ponder(self, board: chess.Board, move: chess.Move, **limits) -> Search:
+        """
+        Starts "go ponder" on `board` after the predicted reply `move`.
+
+        On a ponder hit call Search.ponderhit() and wait() for the result,
+        on a miss stop() it.
+        """
+        pondered = board.copy()
+        pondered.push(move)
+        await self.position(pondered)
+        return await self.go(ponder=True, **limits)
+
+    async def search(
+        self,
+        board: chess.Board,
+        timeout: Optional[float] = None,
+        early_exit: Optional[dict] = None,
+        **limits,
+    ) -> SearchResult:
+        """
+        position + go + wait in one call.
+
+        With `early_exit` (keyword arguments of Search.wait_stable) the
+        search is stopped once its best move is stable.
+        """
+        await self.position(board)
+        search = await self.go(**limits)
+        if early_exit is not None:
+            return await search.wait_stable(timeout, **early_exit)
+        return await search.wait(timeout)
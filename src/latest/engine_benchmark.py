@@ -0,0 +1,135 @@
+# engine_benchmark.py
+#
+# Per-move engine latency: "position fen ..." vs. incremental
+# "position startpos moves ..." over the same game.
+#
+# The game is played once by the engine itself, then replayed move by move
+# on a fresh engine in each mode with the same search limit, so the only
+# difference is how the position is sent.
+#
+#   python3 engine_benchmark.py
+#   python3 engine_benchmark.py --plies 60 --depth 16 --json engine.json
+#   python3 engine_benchmark.py --movetime 500      # compare reached depth instead
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+import chess
+
+from engine import UciEngine
+from selfplay_benchmark import percentile
+
+STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+OPTIONS = {"Threads": 2, "Hash": 64}
+
+
+async def play_line(engine_path: str, plies: int, limits: dict) -> list[chess.Move]:
+    engine = UciEngine(engine_path, OPTIONS)
+    await engine.start()
+    await engine.new_game()
+    board = chess.Board()
+    try:
+        while len(board.move_stack) < plies and not board.is_game_over():
+            result = await engine.search(board, **limits)
+            if not result.bestmove:
+                break
+            board.push_uci(result.bestmove)
+    finally:
+        await engine.quit()
+    return board.move_stack
+
+
+async def replay(engine_path: str, moves: list[chess.Move], limits: dict, incremental: bool) -> list[dict]:
+    """
+    Searches every position of the game in order, like the robot does on
+    its turns, and records the time from "position" to "bestmove".
+    """
+    engine = UciEngine(engine_path, OPTIONS, incremental=incremental)
+    await engine.start()
+    await engine.new_game()
+    board = chess.Board()
+    rows = []
+    try:
+        for move in moves:
+            started = time.perf_counter()
+            result = await engine.search(board, **limits)
+            rows.append({
+                "ply": len(board.move_stack),
+                "latency_s": time.perf_counter() - started,
+                "depth": result.info.get("depth"),
+                "nodes": result.info.get("nodes"),
+                "bestmove": result.bestmove,
+            })
+            board.push(move)
+    finally:
+        await engine.quit()
+    return rows
+
+
+def summarize(rows: list[dict]) -> dict:
+    latencies = [r["latency_s"] for r in rows]
+    depths = [r["depth"] for r in rows if r["depth"]]
+    nodes = [r["nodes"] for r in rows if r["nodes"]]
+    return {
+        "moves": len(rows),
+        "mean_s": statistics.mean(latencies) if latencies else 0.0,
+        "p50_s": percentile(latencies, 0.50),
+        "p95_s": percentile(latencies, 0.95),
+        "mean_depth": statistics.mean(depths) if depths else 0,
+        "mean_nodes": statistics.mean(nodes) if nodes else 0,
+    }
+
+
+async def run(engine_path: str, plies: int, limits: dict) -> dict:
+    moves = await play_line(engine_path, plies, limits)
+    fen_rows = await replay(engine_path, moves, limits, incremental=False)
+    inc_rows = await replay(engine_path, moves, limits, incremental=True)
+    return {
+        "limits": limits,
+        "moves": [m.uci() for m in moves],
+        "fen": summarize(fen_rows),
+        "incremental": summarize(inc_rows),
+        "rows": {"fen": fen_rows, "incremental": inc_rows},
+    }
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "-" * 60)
+    print(f"{'mode':<12} {'mean':>8} {'p50':>8} {'p95':>8} {'depth':>6} {'nodes':>10}")
+    print("-" * 60)
+    for mode in ("fen", "incremental"):
+        s = report[mode]
+        print(
+            f"{mode:<12} {s['mean_s'] * 1000:>6.0f}ms {s['p50_s'] * 1000:>6.0f}ms "
+            f"{s['p95_s'] * 1000:>6.0f}ms {s['mean_depth']:>6.1f} {s['mean_nodes']:>10.0f}"
+        )
+    print("-" * 60)
+    fen, inc = report["fen"]["mean_s"], report["incremental"]["mean_s"]
+    print(f"📊 {report['fen']['moves']} positions, {report['limits']}")
+    if fen:
+        print(f"   incremental vs fen: {(fen - inc) / fen:+.1%} mean latency")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="FEN vs. incremental position latency")
+    parser.add_argument("--engine", default=STOCKFISH_PATH)
+    parser.add_argument("--plies", type=int, default=40)
+    parser.add_argument("--depth", type=int, default=14)
+    parser.add_argument("--movetime", type=int, help="ms per move instead of a fixed depth")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    limits = {"movetime": args.movetime} if args.movetime else {"depth": args.depth}
+    report = asyncio.run(run(args.engine, args.plies, limits))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
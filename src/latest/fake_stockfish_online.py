@@ -0,0 +1,105 @@
+# fake_stockfish_online.py
+#
+# Local stand-in for the stockfish.online API to test remote_engine.py
+# without the internet. Answers with a legal move in the API's format and
+# can add latency and inject failures.
+#
+#   python3 fake_stockfish_online.py --port 8765 --latency 0.5 --jitter 0.3 --fail 0.2
+#   python3 remote_engine.py --url http://127.0.0.1:8765/api/s/v2.php
+#
+# Failure kinds (picked at random with --fail): HTTP 500, "success": false,
+# an illegal move, broken JSON and a hang longer than any client timeout.
+import sys
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import chess
+
+FAILURES = ("http500", "unsuccessful", "illegal", "badjson", "hang")
+
+
+class Handler(BaseHTTPRequestHandler):
+    # set in main()
+    latency = 0.0
+    jitter = 0.0
+    fail = 0.0
+    hang = 30.0
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            pass  # client gave up (timeout or race lost)
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        time.sleep(self.latency + random.random() * self.jitter)
+
+        try:
+            board = chess.Board(params["fen"][0])
+        except (KeyError, ValueError):
+            self._send(200, json.dumps({"success": False, "data": "invalid fen"}).encode())
+            return
+
+        failure = random.choice(FAILURES) if random.random() < self.fail else None
+        print(f"• {board.fen()} -> {failure or 'ok'}")
+
+        if failure == "http500":
+            self._send(500, b'{"success": false}')
+            return
+        if failure == "unsuccessful":
+            self._send(200, json.dumps({"success": False, "data": "overloaded"}).encode())
+            return
+        if failure == "badjson":
+            self._send(200, b'{"success": tr')
+            return
+        if failure == "hang":
+            time.sleep(self.hang)
+
+        moves = sorted(board.legal_moves, key=lambda m: m.uci())
+        if not moves:
+            self._send(200, json.dumps({"success": False, "data": "game over"}).encode())
+            return
+        move = moves[0].uci() if failure != "illegal" else "a1a1"
+        self._send(200, json.dumps({
+            "success": True,
+            "evaluation": 0.25,
+            "mate": None,
+            "bestmove": f"bestmove {move}",
+            "continuation": move,
+        }).encode())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stand-in stockfish.online server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds added to every answer")
+    parser.add_argument("--jitter", type=float, default=0.2, help="random extra seconds")
+    parser.add_argument("--fail", type=float, default=0.0, help="fraction of failed answers")
+    parser.add_argument("--hang", type=float, default=30.0, help="seconds a hanging answer takes")
+    args = parser.parse_args(argv)
+
+    Handler.latency, Handler.jitter, Handler.fail, Handler.hang = args.latency, args.jitter, args.fail, args.hang
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"🌐 Stand-in stockfish.online on http://127.0.0.1:{args.port}/api/s/v2.php")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -3,9 +3,14 @@
 from interbotix_common_modules.common_robot.robot import robot_shutdown, robot_startup
 from interbotix_xs_modules.xs_robot.arm import InterbotixManipulatorXS
 
+from robot_state import ArmActivity
+
 class Chess_Robot:
 
-	def __init__(self):
+	def __init__(self, activity=None):
+		# shared with the speech pipeline, set while the arm is moving
+		self.activity = activity or ArmActivity()
+
 		self.bot = InterbotixManipulatorXS(
 			robot_model='wx250s',
 			group_name='arm',
@@ -30,6 +35,10 @@ class Chess_Robot:
 		
 	# move a chess piece to a new, empty position
 	def robot_move(self, from_x, to_x, from_y, to_y):
+		with self.activity.motion():
+			self._robot_move(from_x, to_x, from_y, to_y)
+
+	def _robot_move(self, from_x, to_x, from_y, to_y):
 		above_z = 0.38 # height where the gripper doesn't interfere with pieces
 		
 		# height where gripper can grab pieces
@@ -71,6 +80,10 @@ class Chess_Robot:
 	# functionally, the opponent piece is taken first, then the piece is moved
 	# onto the now empty field
 	def robot_take(self, from_x, to_x, from_y, to_y):
+		with self.activity.motion():
+			self._robot_take(from_x, to_x, from_y, to_y)
+
+	def _robot_take(self, from_x, to_x, from_y, to_y):
 		above_z = 0.38 # height where the gripper doesn't interfere with pieces
 		
 		# height where gripper can grab pieces
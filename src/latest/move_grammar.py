@@ -0,0 +1,153 @@
+# move_grammar.py
+import math
+
+import chess
+
+FILE_WORDS = ["a", "b", "c", "d", "e", "f", "g", "h"]
+RANK_WORDS = ["eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht"]
+
+PIECE_WORDS = {
+    chess.PAWN: "bauer",
+    chess.KNIGHT: "springer",
+    chess.BISHOP: "läufer",
+    chess.ROOK: "turm",
+    chess.QUEEN: "dame",
+    chess.KING: "könig",
+}
+
+SHORT_CASTLE = ["kurze rochade", "rochade kurz"]
+LONG_CASTLE = ["lange rochade", "rochade lang"]
+
+UNKNOWN = "[unk]"
+
+GERMAN_NUMBERS = {word: str(i + 1) for i, word in enumerate(RANK_WORDS)}
+
+
+def spoken_square(square: chess.Square) -> str:
+    # e.g. chess.E2 -> "e zwei"
+    return f"{FILE_WORDS[chess.square_file(square)]} {RANK_WORDS[chess.square_rank(square)]}"
+
+
+def spoken_move(move: chess.Move) -> str:
+    # e.g. e2e4 -> "e zwei e vier"
+    return f"{spoken_square(move.from_square)} {spoken_square(move.to_square)}"
+
+
+def normalize(spoken: str) -> str:
+    return " ".join(t for t in spoken.lower().split() if t != UNKNOWN)
+
+
+class SpokenMoveIndex:
+    """
+    Per-position index from spoken forms to legal moves.
+
+    Built once per ply, then every lookup is a single dict access. Besides
+    the four-coordinate form ("e zwei e vier") it understands piece names
+    and short forms like "springer f drei", "turm nach d eins",
+    "bauer e vier", "e vier", "e sieben e acht dame" and castling words.
+
+    Phrases that fit more than one legal move stay in the grammar (so the
+    decoder does not force them onto a different move) but resolve to None.
+    """
+
+    def __init__(self, board: chess.Board):
+        self._moves: dict[str, set[str]] = {}
+
+        for move in board.legal_moves:
+            for phrase in self._phrases(board, move):
+                self._moves.setdefault(phrase, set()).add(move.uci())
+
+        # unique phrases -> move, the hot path for lookup()
+        self._unique = {p: next(iter(m)) for p, m in self._moves.items() if len(m) == 1}
+
+    @staticmethod
+    def _phrases(board: chess.Board, move: chess.Move) -> list[str]:
+        frm = spoken_square(move.from_square)
+        to = spoken_square(move.to_square)
+        piece = board.piece_type_at(move.from_square)
+        name = PIECE_WORDS[piece]
+
+        # coordinate forms
+        phrases = [f"{frm} {to}", f"{frm} nach {to}", f"von {frm} nach {to}"]
+
+        # piece forms
+        phrases += [
+            f"{name} {to}",
+            f"{name} nach {to}",
+            f"{name} auf {to}",
+            f"{name} {frm} {to}",
+            f"{name} von {frm} nach {to}",
+        ]
+        if piece == chess.PAWN:
+            phrases.append(to)
+
+        if move.promotion:
+            promo = PIECE_WORDS[move.promotion]
+            phrases = [f"{p} {promo}" for p in phrases]
+
+        # castling: the king move as spoken before, plus the castling words
+        if board.is_castling(move):
+            phrases += SHORT_CASTLE if board.is_kingside_castling(move) else LONG_CASTLE
+
+        return phrases
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def lookup(self, spoken: str) -> str | None:
+        """
+        UCI move for a spoken phrase, None if unknown or ambiguous.
+        """
+        return self._unique.get(normalize(spoken))
+
+    def candidates(self, spoken: str) -> set[str]:
+        return self._moves.get(normalize(spoken), set())
+
+    def grammar(self) -> list[str]:
+        """
+        Vosk grammar: every spoken form of every legal move. "[unk]" lets
+        the decoder reject noise instead of forcing it onto the closest move.
+        """
+        return sorted(self._moves) + [UNKNOWN]
+
+
+def spoken_to_uci(spoken: str) -> str | None:
+    """
+    "e zwei e vier" -> "e2e4", None unless exactly four coordinates were heard.
+    """
+    cleaned = []
+    for t in spoken.lower().split():
+        if t in FILE_WORDS:
+            cleaned.append(t)
+        elif t in GERMAN_NUMBERS:
+            cleaned.append(GERMAN_NUMBERS[t])
+
+    return "".join(cleaned) if len(cleaned) == 4 else None
+
+
+def rank_alternatives(index: SpokenMoveIndex, alternatives: list) -> list[tuple[str, float]]:
+    """
+    Scores an n-best list [(text, confidence), ...] against the legal moves.
+
+    Alternatives that are not a legal move are dropped first (the caller
+    only gets here when the top transcript was rejected, so it would
+    otherwise take most of the share). The confidences of the rest are
+    turned into a distribution (softmax); alternatives that name the same
+    legal move add up.
+
+    Returns [(uci, probability), ...], best first.
+    """
+    legal = [(index.lookup(text), c) for text, c in alternatives]
+    legal = [(uci, c) for uci, c in legal if uci]
+    if not legal:
+        return []
+
+    top = max(c for _, c in legal)
+    weights = [math.exp(c - top) for _, c in legal]
+    total = sum(weights)
+
+    scores: dict[str, float] = {}
+    for (uci, _), w in zip(legal, weights):
+        scores[uci] = scores.get(uci, 0.0) + w / total
+
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
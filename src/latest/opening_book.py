@@ -0,0 +1,69 @@
+# opening_book.py
+import os
+from typing import Optional
+
+import chess
+import chess.polyglot
+
+BOOK_PATH = "book.bin"
+
+
+class OpeningBook:
+    """
+    Polyglot opening book in front of the engine.
+
+    The .bin file is memory-mapped (chess.polyglot.MemoryMappedReader) and
+    entries are found with a binary search on the Zobrist key, so a lookup
+    costs microseconds instead of a depth-18 search. Positions that are not
+    in the book (or a missing book file) fall through to the engine.
+    """
+
+    def __init__(self, path: str = BOOK_PATH, weighted: bool = True, min_weight: int = 1):
+        self.path = path
+        self.weighted = weighted
+        self.min_weight = min_weight
+
+        self._reader: Optional[chess.polyglot.MemoryMappedReader] = None
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(path):
+            self._reader = chess.polyglot.open_reader(path)
+        else:
+            print(f"⚠️ No opening book at {path}, using the engine only.")
+
+    @property
+    def available(self) -> bool:
+        return self._reader is not None
+
+    def choose(self, board: chess.Board) -> Optional[str]:
+        """
+        Book move for `board` as UCI, None if the position is not in the book.
+
+        With `weighted` the move is picked at random proportional to its
+        weight, otherwise the highest weighted move is played.
+        """
+        if self._reader is None:
+            return None
+
+        try:
+            if self.weighted:
+                entry = self._reader.weighted_choice(board, exclude_moves=self._weak_moves(board))
+            else:
+                entry = self._reader.find(board, minimum_weight=self.min_weight)
+        except IndexError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.move.uci()
+
+    def _weak_moves(self, board: chess.Board) -> list:
+        if self.min_weight <= 1:
+            return []
+        return [e.move for e in self._reader.find_all(board) if e.weight < self.min_weight]
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -0,0 +1,224 @@
+# position_cache.py
+import os
+import mmap
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+import chess
+import chess.polyglot
+
+# zobrist key, settings id, move, ponder move, score, depth
+RECORD = struct.Struct("<QIHHhBx")
+MATE_SCORE = 32000
+
+
+def encode_move(uci: Optional[str]) -> int:
+    if not uci:
+        return 0
+    move = chess.Move.from_uci(uci)
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(value: int) -> Optional[str]:
+    if not value:
+        return None
+    promotion = value >> 12
+    return chess.Move(value & 63, (value >> 6) & 63, promotion or None).uci()
+
+
+def encode_score(score: Optional[tuple]) -> int:
+    if not score:
+        return 0
+    kind, value = score
+    if kind == "mate":
+        return MATE_SCORE - value if value > 0 else -MATE_SCORE - value
+    return max(-MATE_SCORE + 1000, min(MATE_SCORE - 1000, value))
+
+
+def decode_score(value: int) -> tuple:
+    if value > MATE_SCORE - 1000:
+        return ("mate", MATE_SCORE - value)
+    if value < -MATE_SCORE + 1000:
+        return ("mate", -MATE_SCORE - value)
+    return ("cp", value)
+
+
+def settings_id(settings: str) -> int:
+    # e.g. "depth=18" -> 32-bit id stored next to the zobrist key
+    return zlib.crc32(settings.encode())
+
+
+class CacheEntry:
+    __slots__ = ("bestmove", "ponder", "score", "depth")
+
+    def __init__(self, bestmove: str, ponder: Optional[str], score: Optional[tuple], depth: int):
+        self.bestmove = bestmove
+        self.ponder = ponder
+        self.score = score
+        self.depth = depth
+
+    def __repr__(self) -> str:
+        return f"CacheEntry({self.bestmove}, ponder={self.ponder}, score={self.score}, depth={self.depth})"
+
+
+class PositionCache:
+    """
+    Best-move / eval cache keyed by the python-chess Zobrist hash plus the
+    search settings.
+
+    Two tiers:
+      - an LRU dict in memory for positions seen in this process
+      - a compact file of sorted fixed-size records, memory-mapped at
+        startup and searched with a binary search
+
+    save() merges the memory tier into the file (written to a temp file and
+    swapped in). hits/misses count lookups for both tiers together.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 4096):
+        self.path = path
+        self.capacity = capacity
+
+        self._lru: "OrderedDict[tuple[int, int], CacheEntry]" = OrderedDict()
+        self._dirty: dict = {}
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path) and os.path.getsize(path) >= RECORD.size:
+            self._open(path)
+
+    # ------------------------
+    # Disk tier
+    # ------------------------
+    def _open(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = len(self._mm) // RECORD.size
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    def _record(self, i: int) -> tuple:
+        return RECORD.unpack_from(self._mm, i * RECORD.size)
+
+    def _disk_get(self, key: tuple[int, int]) -> Optional[CacheEntry]:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[:2] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            rec = self._record(lo)
+            if rec[:2] == key:
+                return CacheEntry(decode_move(rec[2]), decode_move(rec[3]), decode_score(rec[4]), rec[5])
+        return None
+
+    # ------------------------
+    # Public API
+    # ------------------------
+    @staticmethod
+    def key(board: chess.Board, settings: str) -> tuple[int, int]:
+        return chess.polyglot.zobrist_hash(board), settings_id(settings)
+
+    def get(self, board: chess.Board, settings: str) -> Optional[CacheEntry]:
+        key = self.key(board, settings)
+
+        entry = self._lru.get(key)
+        if entry is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if self._mm is not None:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, board: chess.Board, settings: str, bestmove: str,
+            ponder: Optional[str] = None, score: Optional[tuple] = None, depth: int = 0) -> None:
+        self.put_hash(chess.polyglot.zobrist_hash(board), settings, bestmove, ponder, score, depth)
+
+    def put_hash(self, zobrist: int, settings: str, bestmove: str,
+                 ponder: Optional[str] = None, score: Optional[tuple] = None, depth: int = 0) -> None:
+        """
+        Like put() for callers that only have the Zobrist key (e.g. book_builder).
+        """
+        key = (zobrist, settings_id(settings))
+        entry = CacheEntry(bestmove, ponder, score, depth)
+        self._remember(key, entry)
+        self._dirty[key] = entry
+
+    def _remember(self, key: tuple[int, int], entry: CacheEntry) -> None:
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Merges new entries into the sorted on-disk file and re-maps it.
+        """
+        path = path or self.path
+        if not path or (not self._dirty and path == self.path):
+            return
+
+        records = {}
+        for i in range(self._count):
+            rec = self._record(i)
+            records[rec[:2]] = rec
+        for key, e in self._dirty.items():
+            records[key] = (
+                *key, encode_move(e.bestmove), encode_move(e.ponder),
+                encode_score(e.score), min(255, e.depth),
+            )
+
+        write_records(path, records.values())
+
+        self.close()
+        self._dirty.clear()
+        self.path = path
+        self._open(path)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": self._count,
+        }
+
+
+def write_records(path: str, records) -> None:
+    """
+    Writes RECORD tuples sorted by (zobrist, settings) to `path` atomically.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for rec in sorted(records, key=lambda r: (r[0], r[1])):
+            f.write(RECORD.pack(*rec))
+    os.replace(tmp, path)
@@ -0,0 +1,51 @@
+# push_to_talk.py
+import multiprocessing as mp
+import time
+
+from Lights import Light
+
+
+class TalkGate:
+    """
+    Push-to-talk state shared with the speech worker process.
+
+    `enabled` is set once the first button event arrives (boards without
+    the button keep the VAD path), `pressed` while the button is held.
+    """
+
+    def __init__(self):
+        ctx = mp.get_context("spawn")
+        self.enabled = ctx.Event()
+        self.pressed = ctx.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.enabled.is_set()
+
+
+class PushToTalk:
+    """
+    Host-side listener for the ESP32 push-to-talk button.
+
+    Uses the serial link Light already holds open and turns
+    BUTTON_DOWN / BUTTON_UP lines into the shared TalkGate.
+    """
+
+    def __init__(self, light: Light, gate: TalkGate | None = None):
+        self.gate = gate or TalkGate()
+        self.presses = 0
+        self.last_press = 0.0
+        self.last_duration = 0.0
+
+        light.add_listener(self._on_line)
+
+    def _on_line(self, line: str) -> None:
+        if line == "BUTTON_DOWN":
+            self.gate.enabled.set()
+            self.gate.pressed.set()
+            self.presses += 1
+            self.last_press = time.monotonic()
+        elif line == "BUTTON_UP":
+            self.gate.enabled.set()
+            self.gate.pressed.clear()
+            self.last_duration = time.monotonic() - self.last_press
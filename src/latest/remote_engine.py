@@ -0,0 +1,258 @@
+# remote_engine.py
+#
+# stockfish.online as a second engine next to the local one.
+#
+#   python3 remote_engine.py                                      # race on the start position
+#   python3 remote_engine.py --url http://127.0.0.1:8765/api/s/v2.php --fen "<fen>"
+#   (stand-in server with latency/failures: python3 fake_stockfish_online.py)
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Optional
+
+import chess
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from engine import UciEngine, EngineError, SearchResult
+
+API_URL = "https://stockfish.online/api/s/v2.php"
+STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+
+
+class RemoteEngine:
+    """
+    stockfish.online client.
+
+    One requests.Session with a connection pool is kept for the whole game
+    (keep-alive instead of a new TLS handshake per move), every request
+    has a timeout, and answers are cached by FEN in an LRU so a repeated
+    position costs nothing. Failures (HTTP errors, timeouts,
+    "success": false, illegal moves) return None.
+    """
+
+    def __init__(
+        self,
+        url: str = API_URL,
+        depth: int = 15,
+        timeout: float = 5.0,
+        pool_size: int = 4,
+        retries: int = 1,
+        cache_size: int = 1024,
+    ):
+        self.url = url
+        self.depth = depth
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, backoff_factor=0.1, status_forcelist=(502, 503, 504)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache: "OrderedDict[str, SearchResult]" = OrderedDict()
+        self._lock = threading.Lock()  # requests run in executor threads
+
+        # Counters
+        self.requests = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    def best_move(self, board: chess.Board, timeout: Optional[float] = None) -> Optional[SearchResult]:
+        """
+        Blocking lookup, None if the service did not give a legal move.
+        """
+        fen = board.fen()
+        with self._lock:
+            cached = self._cache.get(fen)
+            if cached is not None:
+                self._cache.move_to_end(fen)
+                self.cache_hits += 1
+                return replace(cached, elapsed=0.0)
+            self.requests += 1
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                self.url,
+                params={"fen": fen, "depth": self.depth},
+                timeout=timeout or self.timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Remote engine failed: {e}")
+            self.failures += 1
+            return None
+
+        result = self._parse(board, data)
+        if result is None:
+            print(f"⚠️ Remote engine answer rejected: {data}")
+            self.failures += 1
+            return None
+        result.elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._cache[fen] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _parse(self, board: chess.Board, data: dict) -> Optional[SearchResult]:
+        # {"success": true, "evaluation": 0.32, "mate": null,
+        #  "bestmove": "bestmove e2e4 ponder e7e5", "continuation": "e2e4 e7e5 ..."}
+        if not isinstance(data, dict) or not data.get("success"):
+            return None
+        parts = str(data.get("bestmove", "")).split()
+        if len(parts) < 2:
+            return None
+        try:
+            move = chess.Move.from_uci(parts[1])
+        except ValueError:
+            return None
+        if move not in board.legal_moves:
+            return None
+
+        # the API scores from White's side, UCI from the side to move
+        sign = 1 if board.turn == chess.WHITE else -1
+        score = None
+        if data.get("mate") is not None:
+            score = ("mate", sign * int(data["mate"]))
+        elif data.get("evaluation") is not None:
+            score = ("cp", sign * int(round(float(data["evaluation"]) * 100)))
+
+        ponder = parts[3] if len(parts) > 3 and parts[2] == "ponder" else None
+        info = {"depth": self.depth, "pv": str(data.get("continuation", "")).split()}
+        if score is not None:
+            info["score"] = score
+        return SearchResult(bestmove=parts[1], ponder=ponder, info=info)
+
+    async def search(self, board: chess.Board, timeout: Optional[float] = None) -> Optional[SearchResult]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.best_move, board.copy(stack=False), timeout)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures,
+            "cached": len(self._cache),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RacingEngine:
+    """
+    Searches locally and asks the remote engine at the same time; the first
+    legal move wins and the other search is stopped (a late remote answer
+    still lands in its cache).
+
+    The local search always ends by the deadline (it is stopped and its
+    best move so far used), so the remote side can only make a move
+    faster, never slower or missing.
+    """
+
+    def __init__(self, local: UciEngine, remote: RemoteEngine, deadline: float = 10.0):
+        self.local = local
+        self.remote = remote
+        self.deadline = deadline
+
+        self.local_wins = 0
+        self.remote_wins = 0
+
+    async def search(
+        self,
+        board: chess.Board,
+        timeout: Optional[float] = None,
+        early_exit: Optional[dict] = None,
+        **limits,
+    ) -> SearchResult:
+        """
+        Same arguments as UciEngine.search(); `timeout` is the deadline.
+        """
+        deadline = timeout if timeout is not None else self.deadline
+
+        await self.local.position(board)
+        search = await self.local.go(**limits)
+        if early_exit is not None:
+            local = asyncio.create_task(search.wait_stable(deadline, **early_exit))
+        else:
+            local = asyncio.create_task(search.wait(deadline))
+        remote = asyncio.create_task(self.remote.search(board, timeout=deadline))
+
+        pending = {local, remote}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                if remote in done and not remote.exception():
+                    result = remote.result()
+                    if result is not None:
+                        self.remote_wins += 1
+                        print(f"• Remote engine first ({result.elapsed:.2f}s)")
+                        return result
+
+                if local in done:
+                    try:
+                        result = local.result()
+                    except EngineError as e:
+                        print(f"⚠️ Local engine failed: {e}")
+                        continue
+                    if result.bestmove:
+                        self.local_wins += 1
+                        return result
+
+            return SearchResult(bestmove=None)
+        finally:
+            if not local.done():
+                try:
+                    await search.stop()
+                except (asyncio.TimeoutError, EngineError):
+                    pass
+                local.cancel()
+            remote.cancel()
+
+    def stats(self) -> dict:
+        return {"local_wins": self.local_wins, "remote_wins": self.remote_wins, **self.remote.stats()}
+
+
+async def _race(engine_path: str, url: str, fen: str, deadline: float, depth: int) -> None:
+    local = UciEngine(engine_path, {"Threads": 2})
+    await local.start()
+    race = RacingEngine(local, RemoteEngine(url), deadline)
+    try:
+        board = chess.Board(fen)
+        for _ in range(2):  # second round is answered from the remote cache
+            started = time.perf_counter()
+            result = await race.search(board, depth=depth)
+            print(f"bestmove {result.bestmove} {result.info.get('score')} in {time.perf_counter() - started:.2f}s")
+        print(f"📊 {race.stats()}")
+    finally:
+        await local.quit()
+        race.remote.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Race the local engine against stockfish.online")
+    parser.add_argument("--engine", default=STOCKFISH_PATH)
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--fen", default=chess.STARTING_FEN)
+    parser.add_argument("--deadline", type=float, default=10.0)
+    parser.add_argument("--depth", type=int, default=18)
+    args = parser.parse_args(argv)
+    asyncio.run(_race(args.engine, args.url, args.fen, args.deadline, args.depth))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
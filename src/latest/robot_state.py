@@ -0,0 +1,30 @@
+# robot_state.py
+import multiprocessing as mp
+from contextlib import contextmanager
+
+
+class ArmActivity:
+    """
+    Shared "arm is moving" flag.
+
+    Set by Chess_Robot for the duration of robot_move/robot_take and read
+    by the microphone capture (also inside the speech worker process), so
+    servo noise never reaches the recognizer.
+    """
+
+    def __init__(self):
+        # spawn context, so the event can be handed to the speech worker
+        self.event = mp.get_context("spawn").Event()
+
+    @property
+    def moving(self) -> bool:
+        return self.event.is_set()
+
+    @contextmanager
+    def motion(self):
+        self.event.set()
+        try:
+            yield
+        finally:
+            # arm is back in its rest pose (or failed), capture resumes
+            self.event.clear()
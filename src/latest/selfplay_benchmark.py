@@ -0,0 +1,241 @@
+# selfplay_benchmark.py
+#
+# Throughput benchmark for the engine layer: Stockfish-vs-Stockfish games
+# played in parallel, one engine per worker process.
+#
+# Records per move the search latency and nodes per second, how many
+# positions per second python-chess validates (legality check, push,
+# game-over test) and per worker the CPU time and peak RSS of both the
+# Python process and its engine. Use it to compare engine builds and
+# settings on the robot's board before deploying them.
+#
+#   python3 selfplay_benchmark.py --games 8 --movetime 200 --json selfplay.json
+#   python3 selfplay_benchmark.py --engine ./stockfish-dev --depth 10 --jobs 2 --threads 2
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import resource
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from engine import UciEngine
+from autotune import peak_rss_mb
+
+STOCKFISH_PATH = "/home/ubuntu/stockfish/stockfish-android-armv8/stockfish/stockfish-android-armv8"
+
+
+def process_cpu_s(pid: int) -> float | None:
+    # Linux only; utime + stime of another process
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+# ------------------------
+# Worker process
+# ------------------------
+_loop = None
+_engine = None
+_games = 0
+
+
+def _init_worker(engine_path: str, threads: int, hash_mb: int) -> None:
+    global _loop, _engine
+    _loop = asyncio.new_event_loop()
+    _engine = UciEngine(engine_path, {"Threads": threads, "Hash": hash_mb})
+    _loop.run_until_complete(_engine.start())
+
+
+async def _play(seed: int, random_plies: int, max_plies: int, limits: dict) -> dict:
+    rng = random.Random(seed)
+    board = chess.Board()
+    await _engine.new_game()
+
+    latencies, nps = [], []
+    validated, validation_s = 0, 0.0
+
+    # a few random plies so the games do not all repeat the same line
+    for _ in range(random_plies):
+        if board.is_game_over():
+            break
+        board.push(rng.choice(list(board.legal_moves)))
+
+    while not board.is_game_over() and len(board.move_stack) < max_plies:
+        started = time.perf_counter()
+        result = await _engine.search(board, **limits)
+        latencies.append(time.perf_counter() - started)
+        if result.info.get("nps"):
+            nps.append(result.info["nps"])
+        if not result.bestmove:
+            break
+
+        started = time.perf_counter()
+        move = chess.Move.from_uci(result.bestmove)
+        if move not in board.legal_moves:
+            raise ValueError(f"illegal engine move {result.bestmove} in {board.fen()}")
+        board.push(move)
+        board.is_game_over()
+        validation_s += time.perf_counter() - started
+        validated += 1
+
+    return {
+        "result": board.result(claim_draw=True),
+        "plies": len(board.move_stack),
+        "latencies": latencies,
+        "nps": nps,
+        "validated": validated,
+        "validation_s": validation_s,
+    }
+
+
+def play_game(args) -> dict:
+    global _games
+    game = _loop.run_until_complete(_play(*args))
+    _games += 1
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    game["worker"] = {
+        "pid": os.getpid(),
+        "engine_name": _engine.id.get("name"),
+        "games": _games,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "rss_mb": peak_rss_mb(os.getpid()),
+        "engine_cpu_s": process_cpu_s(_engine.pid),
+        "engine_rss_mb": peak_rss_mb(_engine.pid),
+    }
+    return game
+
+
+# ------------------------
+# Main
+# ------------------------
+def run(
+    engine_path: str,
+    games: int,
+    jobs: int,
+    limits: dict,
+    threads: int = 1,
+    hash_mb: int = 16,
+    random_plies: int = 4,
+    max_plies: int = 200,
+    seed: int = 0,
+) -> dict:
+    latencies, nps, results = [], [], Counter()
+    validated, validation_s, plies = 0, 0.0, 0
+    workers: dict[int, dict] = {}
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(engine_path, threads, hash_mb),
+    ) as pool:
+        tasks = [(seed + i, random_plies, max_plies, limits) for i in range(games)]
+        for n, game in enumerate(pool.map(play_game, tasks), 1):
+            latencies += game["latencies"]
+            nps += game["nps"]
+            validated += game["validated"]
+            validation_s += game["validation_s"]
+            plies += game["plies"]
+            results[game["result"]] += 1
+            # the latest snapshot per worker holds its totals
+            workers[game["worker"]["pid"]] = game["worker"]
+            print(f"• {n}/{games} games, {game['result']} after {game['plies']} plies")
+    wall = time.perf_counter() - started
+
+    return {
+        "engine": engine_path,
+        "engine_name": next((w["engine_name"] for w in workers.values()), None),
+        "machine": f"{platform.node()} {platform.machine()} {os.cpu_count()} cores",
+        "settings": {"jobs": jobs, "threads": threads, "hash_mb": hash_mb, **limits},
+        "games": games,
+        "plies": plies,
+        "wall_s": wall,
+        "games_per_s": games / wall,
+        "moves_per_s": len(latencies) / wall,
+        "latency_s": {
+            "mean": statistics.mean(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies, default=0.0),
+        },
+        "nps": {
+            "mean": statistics.mean(nps) if nps else 0,
+            "p50": percentile(nps, 0.50),
+        },
+        "validation": {
+            "positions": validated,
+            "positions_per_s": validated / validation_s if validation_s else 0.0,
+        },
+        "results": dict(results),
+        "workers": sorted(workers.values(), key=lambda w: w["pid"]),
+    }
+
+
+def print_report(report: dict) -> None:
+    lat = report["latency_s"]
+    print("\n" + "-" * 72)
+    print(f"{'worker':<8} {'games':>5} {'cpu':>8} {'rss':>8} {'engine cpu':>11} {'engine rss':>11}")
+    print("-" * 72)
+    for w in report["workers"]:
+        engine_cpu = f"{w['engine_cpu_s']:.1f}s" if w["engine_cpu_s"] is not None else "?"
+        engine_rss = f"{w['engine_rss_mb']:.0f}MB" if w["engine_rss_mb"] is not None else "?"
+        rss = f"{w['rss_mb']:.0f}MB" if w["rss_mb"] is not None else "?"
+        print(f"{w['pid']:<8} {w['games']:>5} {w['cpu_s']:>7.1f}s {rss:>8} {engine_cpu:>11} {engine_rss:>11}")
+    print("-" * 72)
+    print(f"📊 {report['games']} games, {report['plies']} plies in {report['wall_s']:.1f}s {report['settings']}")
+    print(f"   throughput : {report['games_per_s']:.2f} games/s, {report['moves_per_s']:.1f} moves/s")
+    print(f"   latency    : p50 {lat['p50'] * 1000:.0f} ms, p95 {lat['p95'] * 1000:.0f} ms, max {lat['max'] * 1000:.0f} ms")
+    print(f"   engine     : {report['nps']['mean']:.0f} nps per engine")
+    print(f"   validation : {report['validation']['positions_per_s']:.0f} positions/s (python-chess)")
+    print(f"   results    : {report['results']}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Parallel Stockfish self-play benchmark")
+    parser.add_argument("--engine", default=STOCKFISH_PATH)
+    parser.add_argument("--games", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=0, help="engine processes (0 = all cores)")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per engine")
+    parser.add_argument("--hash", type=int, default=16, help="Hash per engine in MB")
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--movetime", type=int, help="ms per move instead of a fixed depth")
+    parser.add_argument("--random-plies", type=int, default=4)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    limits = {"movetime": args.movetime} if args.movetime else {"depth": args.depth}
+    report = run(
+        args.engine, args.games, jobs, limits,
+        threads=args.threads, hash_mb=args.hash,
+        random_plies=args.random_plies, max_plies=args.max_plies, seed=args.seed,
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,244 @@
+# speech_benchmark.py
+#
+# Offline benchmark for the speech-to-move path, no microphone needed.
+#
+# Corpus: a directory of 16 kHz mono int16 WAV files named after the move
+# they contain, e.g. "e2e4_anna.wav", "g1f3-03.wav" or "e7e8q_x.wav".
+#
+#   python3 speech_benchmark.py corpus/
+#   python3 speech_benchmark.py corpus/ --fen "<fen>"   # decode with the per-ply grammar
+#   python3 speech_benchmark.py corpus/ --jobs 4        # throughput run, one model per core
+#   python3 speech_benchmark.py corpus/ --batch         # Vosk BatchRecognizer (CUDA build)
+#   python3 speech_benchmark.py corpus/ --json out.json
+import os
+import re
+import sys
+import json
+import time
+import wave
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+from move_grammar import SpokenMoveIndex, spoken_to_uci
+from selfplay_benchmark import percentile
+
+CHUNK = 4096
+LABEL_RE = re.compile(r"^([a-h][1-8][a-h][1-8](?:[qrbn](?![a-z]))?)")
+
+
+def load_corpus(path: str) -> list[tuple[str, str]]:
+    """
+    Returns [(wav_path, expected_uci)] for every labelled WAV in `path`.
+    """
+    items = []
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(".wav"):
+            continue
+        m = LABEL_RE.match(name.lower())
+        if not m:
+            print(f"⚠️ Skipping unlabelled file: {name}")
+            continue
+        items.append((os.path.join(path, name), m.group(1)))
+    return items
+
+
+def read_wav(path: str) -> tuple[bytes, float]:
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != 16000:
+            raise ValueError(f"{path}: expected 16 kHz mono int16")
+        frames = wf.getnframes()
+        return wf.readframes(frames), frames / wf.getframerate()
+
+
+class WavCapture:
+    """
+    Stands in for audio_capture.MicrophoneCapture: serves a recorded file
+    to decode() as if it had just been captured, then reports the capture
+    as closed.
+    """
+
+    def __init__(self, pcm: bytes):
+        self.pcm = pcm
+
+    @property
+    def position(self) -> int:
+        return len(self.pcm) // 2
+
+    def start_position(self, preroll: float = 0.0) -> int:
+        return 0
+
+    def read(self, pos: int, frames: int, timeout: float | None = None) -> tuple[bytes | None, int]:
+        data = self.pcm[pos * 2:(pos + frames) * 2]
+        if not data:
+            return None, pos
+        return data, pos + len(data) // 2
+
+
+# ------------------------
+# Decoding
+# ------------------------
+def decode_file(path: str, grammar: list | None) -> tuple[str, float, float]:
+    """
+    Decodes one file through decode() with the chunk size, partials and
+    VAD of the speech worker's turns, so the latency is the pipeline's.
+
+    Returns (text, decode_seconds, audio_seconds).
+    """
+    from speech_recognition import get_service, decode, _final_result, PARTIAL_CHUNK, USE_VAD
+    from vad import EnergyVAD
+
+    service = get_service()
+    pcm, duration = read_wav(path)
+    recognizer = service.acquire(grammar)
+    vad = EnergyVAD() if USE_VAD else None
+
+    start = time.perf_counter()
+    text = ""
+    try:
+        # one utterance per file: the first final result is the answer, like in a turn
+        for text, final, _ in decode(recognizer, WavCapture(pcm), 0, PARTIAL_CHUNK, partials=True, vad=vad):
+            if final:
+                break
+        else:
+            # end of file before the VAD closed the utterance
+            text = _final_result(recognizer.FinalResult())[0]
+    finally:
+        service.release(recognizer)
+
+    elapsed = time.perf_counter() - start
+    return text.strip(), elapsed, duration
+
+
+def _decode_job(args):
+    path, grammar = args
+    return decode_file(path, grammar)
+
+
+def decode_batch(paths: list[str]) -> list[tuple[str, float, float]]:
+    """
+    Throughput run through Vosk's BatchRecognizer (needs a CUDA-enabled Vosk).
+
+    All streams are decoded together, so the per-utterance time is the
+    wall time divided by the number of utterances.
+    """
+    from speech_recognition import MODEL_PATH
+    from vosk import BatchModel, BatchRecognizer
+
+    model = BatchModel(MODEL_PATH)
+    audio = [read_wav(p) for p in paths]
+    recs = [BatchRecognizer(model, 16000) for _ in paths]
+    texts: list[list[str]] = [[] for _ in paths]
+
+    start = time.perf_counter()
+    offset = 0
+    while any(offset < len(pcm) for pcm, _ in audio):
+        for i, (pcm, _) in enumerate(audio):
+            if offset < len(pcm):
+                recs[i].AcceptWaveform(pcm[offset:offset + CHUNK * 2])
+                if offset + CHUNK * 2 >= len(pcm):
+                    recs[i].FinishStream()
+        model.Wait()
+        for i, rec in enumerate(recs):
+            res = rec.Result()
+            if res:
+                texts[i].append(json.loads(res).get("text", ""))
+        offset += CHUNK * 2
+    elapsed = time.perf_counter() - start
+
+    per_item = elapsed / len(paths) if paths else 0.0
+    return [(" ".join(t).strip(), per_item, duration) for t, (_, duration) in zip(texts, audio)]
+
+
+# ------------------------
+# Report
+# ------------------------
+def run(corpus: str, fen: str | None = None, jobs: int = 1, batch: bool = False) -> dict:
+    items = load_corpus(corpus)
+    if not items:
+        raise SystemExit(f"No labelled WAV files in {corpus}")
+
+    # with a position, decode and score exactly like the controller does
+    index = SpokenMoveIndex(chess.Board(fen)) if fen else None
+    grammar = index.grammar() if index else None
+    paths = [p for p, _ in items]
+
+    wall = time.perf_counter()
+    if batch:
+        results = decode_batch(paths)
+    elif jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_decode_job, [(p, grammar) for p in paths]))
+    else:
+        results = [decode_file(p, grammar) for p in paths]
+    wall = time.perf_counter() - wall
+
+    rows = []
+    for (path, expected), (text, elapsed, duration) in zip(items, results):
+        uci = index.lookup(text) if index else spoken_to_uci(text)
+        rows.append({
+            "file": os.path.basename(path),
+            "expected": expected,
+            "text": text,
+            "uci": uci,
+            # without a position only the squares are heard, not the promotion piece
+            "correct": uci == (expected if index else expected[:4]),
+            "decode_s": elapsed,
+            "audio_s": duration,
+            "rtf": elapsed / duration if duration else 0.0,
+        })
+
+    latencies = [r["decode_s"] for r in rows]
+    audio_total = sum(r["audio_s"] for r in rows)
+    return {
+        "utterances": len(rows),
+        "accuracy": sum(r["correct"] for r in rows) / len(rows),
+        "p50_s": percentile(latencies, 0.50),
+        "p95_s": percentile(latencies, 0.95),
+        "rtf": sum(latencies) / audio_total if audio_total else 0.0,
+        "wall_s": wall,
+        "throughput_rtf": wall / audio_total if audio_total else 0.0,
+        "mode": "batch" if batch else f"jobs={jobs}",
+        "grammar": bool(grammar),
+        "rows": rows,
+    }
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "-" * 72)
+    print(f"{'file':<24} {'expected':<8} {'uci':<8} {'decode':>8} {'rtf':>6}  text")
+    print("-" * 72)
+    for r in report["rows"]:
+        mark = "✅" if r["correct"] else "❌"
+        print(
+            f"{r['file']:<24} {r['expected']:<8} {str(r['uci']):<8} "
+            f"{r['decode_s'] * 1000:>6.0f}ms {r['rtf']:>6.2f}  {mark} {r['text']}"
+        )
+    print("-" * 72)
+    print(f"📊 {report['utterances']} utterances ({report['mode']}, grammar={report['grammar']})")
+    print(f"   accuracy : {report['accuracy']:.1%}")
+    print(f"   latency  : p50 {report['p50_s'] * 1000:.0f} ms, p95 {report['p95_s'] * 1000:.0f} ms")
+    print(f"   RTF      : {report['rtf']:.3f} per utterance, {report['throughput_rtf']:.3f} wall")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Offline speech-to-move benchmark")
+    parser.add_argument("corpus", help="directory with labelled WAV files")
+    parser.add_argument("--fen", help="decode with the grammar of this position")
+    parser.add_argument("--jobs", type=int, default=1, help="decoder processes (0 = all cores)")
+    parser.add_argument("--batch", action="store_true", help="use Vosk BatchRecognizer")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    report = run(args.corpus, fen=args.fen, jobs=jobs, batch=args.batch)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -3,56 +3,329 @@ os.environ["ALSA_LOG_LEVEL"] = "none"
 
 import sys
 import json
-import pyaudio
+import asyncio
+import time
+import threading
+import numpy as np
+from typing import Optional
 from vosk import Model, KaldiRecognizer, SetLogLevel
 
 from Lights import Light
+from audio_capture import get_capture, PREROLL_SECONDS
+from move_grammar import UNKNOWN
+from vad import EnergyVAD
 SetLogLevel(-1)  # completely disable Vosk/Kaldi logging
 
 MODEL_PATH = "vosk-model-small-de-zamia-0.3"
+SAMPLE_RATE = 16000
+PARTIAL_CHUNK = 1600  # 100 ms per AcceptWaveform call when streaming partials
+USE_VAD = True        # keep silence away from Kaldi
+MAX_ALTERNATIVES = 5  # n-best list per final result
+PTT_PREROLL_SECONDS = 0.15  # covers the button poll / serial latency
 
-def listen():
-    print("Loading Vosk model...")
-    model = Model(MODEL_PATH)
+# Whitelist
+ALLOWED_WORDS = [
+    "springer", "läufer", "turm", "dame", "könig", "bauer",
+    "a", "b", "c", "d", "e", "f", "g", "h",
+    "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht",
+    "von", "nach", "auf", "rochade", "kurze", "kurz", "lange", "lang"
+]
 
-    # Whitelist
-    allowed = [
-        "a", "b", "c", "d", "e", "f", "g", "h",
-        "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht"
-    ]
-    
-    lights = Light()
 
-    recognizer = KaldiRecognizer(model, 16000, json.dumps(allowed, ensure_ascii=False))
-    recognizer.SetWords(True)
+class RecognizerService:
+    """
+    Keeps the Vosk model resident for the whole process.
+
+    The model is loaded once on first use and shared. Each turn borrows a
+    KaldiRecognizer from a small pool and only pays for a Reset() instead
+    of a full model load + decoder graph build.
+
+    stats() reports the one-time model load against the per-turn setup.
+    """
+
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        sample_rate: int = SAMPLE_RATE,
+        pool_size: int = 2,
+    ):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.pool_size = pool_size
+
+        self._model: Optional[Model] = None
+        self._pool: list = []
+        self._grammar: dict = {}  # id(recognizer) -> active grammar json
+        self._lock = threading.Lock()
+
+        # Counters
+        self.model_load_time = 0.0
+        self.turns = 0
+        self.last_setup_time = 0.0
+        self.total_setup_time = 0.0
+
+    # ------------------------
+    # Model / recognizer pool
+    # ------------------------
+    def model(self) -> Model:
+        with self._lock:
+            if self._model is None:
+                print("Loading Vosk model...")
+                start = time.perf_counter()
+                self._model = Model(self.model_path)
+                self.model_load_time = time.perf_counter() - start
+                print(f"• Model loaded in {self.model_load_time:.2f}s")
+            return self._model
+
+    def _new_recognizer(self) -> KaldiRecognizer:
+        grammar = json.dumps(ALLOWED_WORDS, ensure_ascii=False)
+        recognizer = KaldiRecognizer(self.model(), self.sample_rate, grammar)
+        recognizer.SetWords(True)
+        recognizer.SetMaxAlternatives(MAX_ALTERNATIVES)
+        self._grammar[id(recognizer)] = grammar
+        return recognizer
+
+    def acquire(self, grammar: Optional[list] = None) -> KaldiRecognizer:
+        """
+        Returns a ready recognizer for one turn (pooled if possible).
+
+        `grammar` is a list of phrases for this turn (see move_grammar),
+        None falls back to the fixed word whitelist.
+        """
+        start = time.perf_counter()
+        wanted = json.dumps(grammar or ALLOWED_WORDS, ensure_ascii=False)
+
+        with self._lock:
+            recognizer = self._pool.pop() if self._pool else None
+
+        if recognizer is None:
+            recognizer = self._new_recognizer()
+        else:
+            recognizer.Reset()
+
+        if self._grammar.get(id(recognizer)) != wanted:
+            recognizer.SetGrammar(wanted)
+            self._grammar[id(recognizer)] = wanted
+
+        elapsed = time.perf_counter() - start
+        self.turns += 1
+        self.last_setup_time = elapsed
+        self.total_setup_time += elapsed
+        return recognizer
 
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        format=pyaudio.paInt16,
-        channels=1,
-        rate=16000,
-        input=True,
-        frames_per_buffer=8192
+    def release(self, recognizer: KaldiRecognizer) -> None:
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(recognizer)
+            else:
+                self._grammar.pop(id(recognizer), None)
+
+    def preload(self) -> None:
+        """
+        Loads the model and fills the pool, e.g. at startup.
+        """
+        recognizers = [self._new_recognizer() for _ in range(self.pool_size)]
+        with self._lock:
+            self._pool.extend(recognizers[: self.pool_size - len(self._pool)])
+
+    # ------------------------
+    # Counters
+    # ------------------------
+    def stats(self) -> dict:
+        avg = self.total_setup_time / self.turns if self.turns else 0.0
+        return {
+            "model_load_s": self.model_load_time,
+            "turns": self.turns,
+            "last_setup_s": self.last_setup_time,
+            "avg_setup_s": avg,
+        }
+
+
+_service: Optional[RecognizerService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> RecognizerService:
+    """
+    Process-wide recognizer service (created lazily).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RecognizerService()
+        return _service
+
+
+def _start_turn(preroll: float, grammar: Optional[list]):
+    service = get_service()
+    recognizer = service.acquire(grammar)
+
+    stats = service.stats()
+    print(
+        f"• Recognizer setup {stats['last_setup_s'] * 1000:.1f} ms "
+        f"(model load {stats['model_load_s']:.2f}s, once)"
     )
-    stream.start_stream()
+
+    lights = Light()
+
+    # microphone stays open for the whole session
+    capture = get_capture()
 
     print("🎤 Please say your move...")
-    # status 
+    # status
     lights.speech_ready()
 
+    # start decoding a little before the LED turned green
+    pos = capture.start_position(preroll)
+    return service, recognizer, capture, pos
+
+
+def _final_result(result: str) -> tuple[str, list]:
+    """
+    Parses a final result into (top_text, [(text, confidence), ...]).
+
+    With alternatives enabled Vosk returns an n-best list with a score per
+    entry; otherwise the mean word confidence is used.
+    """
+    result = json.loads(result)
+
+    if "alternatives" in result:
+        alternatives = [
+            (alt.get("text", "").strip(), float(alt.get("confidence", 0.0)))
+            for alt in result["alternatives"]
+        ]
+    else:
+        words = result.get("result", [])
+        conf = sum(w.get("conf", 1.0) for w in words) / len(words) if words else 1.0
+        alternatives = [(result.get("text", "").strip(), conf)]
+
+    alternatives = [(t, c) for t, c in alternatives if t and t != UNKNOWN]
+    return (alternatives[0][0] if alternatives else ""), alternatives
+
+
+def decode(recognizer, capture, pos: int, chunk: int = 4096, partials: bool = False, stop=None, vad=None, talk=None):
+    """
+    Feeds captured audio to the recognizer.
+
+    Yields (text, is_final, alternatives); alternatives is the n-best list
+    [(text, confidence), ...] of a final result. Partial hypotheses are only produced when
+    `partials` is set. Ends when `stop` (threading.Event) is set.
+    With a `vad` (EnergyVAD) only speech segments reach Kaldi and the end
+    of a segment forces a final result.
+    With an active push-to-talk `talk` gate (push_to_talk.TalkGate) only
+    audio between press and release is decoded and the release forces
+    the final result; the VAD is bypassed then.
+    """
+    last_partial = ""
+    talking = False
+
+    while stop is None or not stop.is_set():
+        ptt = talk is not None and talk.active
+
+        if ptt and not talk.pressed.is_set():
+            if talking:
+                # button released: flush what is left and finish the utterance
+                talking = False
+                last_partial = ""
+                data, pos = capture.read(pos, capture.position - pos, timeout=0)
+                if data:
+                    recognizer.AcceptWaveform(data)
+                text, alternatives = _final_result(recognizer.FinalResult())
+                if text:
+                    yield text, True, alternatives
+            talk.pressed.wait(0.1)
+            continue
+
+        if ptt and not talking:
+            talking = True
+            pos = capture.start_position(PTT_PREROLL_SECONDS)
+
+        data, pos = capture.read(pos, chunk, timeout=0.5)
+        if data is None:
+            return  # capture closed
+        if not data:
+            continue
+
+        if vad is not None and not ptt:
+            data, ended = vad.process(np.frombuffer(data, dtype=np.int16))
+            if ended:
+                if data:
+                    recognizer.AcceptWaveform(data)
+                last_partial = ""
+                text, alternatives = _final_result(recognizer.FinalResult())
+                if text:
+                    yield text, True, alternatives
+                continue
+            if not data:
+                continue
+
+        if recognizer.AcceptWaveform(data):
+            last_partial = ""
+            text, alternatives = _final_result(recognizer.Result())
+            if text:
+                yield text, True, alternatives
+        elif partials:
+            text = json.loads(recognizer.PartialResult()).get("partial", "").strip()
+            if text and text != UNKNOWN and text != last_partial:
+                last_partial = text
+                yield text, False, []
+
+
+def listen(preroll: float = PREROLL_SECONDS, grammar: Optional[list] = None):
+    service, recognizer, capture, pos = _start_turn(preroll, grammar)
+    vad = EnergyVAD() if USE_VAD else None
+    try:
+        for text, _, _ in decode(recognizer, capture, pos, vad=vad):
+            print("• Recognized:", text)
+            return text
+    finally:
+        service.release(recognizer)
+        if vad is not None:
+            print(f"• VAD skipped {vad.skipped_fraction:.0%} of frames")
+
+
+async def stream_hypotheses(preroll: float = PREROLL_SECONDS, grammar: Optional[list] = None):
+    """
+    Async generator over (text, is_final, alternatives) speech hypotheses.
+
+    Decoding runs in a background thread; partial results are yielded as
+    soon as they change, so the caller can stop at the first usable one
+    instead of waiting for end-of-utterance silence. Closing the generator
+    stops the decoder. `grammar` restricts decoding to the given phrases.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    service, recognizer, capture, pos = await loop.run_in_executor(None, _start_turn, preroll, grammar)
+
+    vad = EnergyVAD() if USE_VAD else None
+
+    def worker():
+        try:
+            for item in decode(recognizer, capture, pos, PARTIAL_CHUNK, partials=True, stop=stop, vad=vad):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            if not stop.is_set():
+                # decode() only ends on its own when the microphone failed
+                raise RuntimeError("microphone closed")
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            service.release(recognizer)
+            if vad is not None:
+                print(f"• VAD skipped {vad.skipped_fraction:.0%} of frames")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
     try:
         while True:
-            data = stream.read(4096, exception_on_overflow=False)
-            if recognizer.AcceptWaveform(data):
-                result = json.loads(recognizer.Result())
-                text = result.get("text", "").strip()
-                if text:
-                    print("• Recognized:", text)
-                    return text
+            item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
     finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
+        stop.set()
 
 if __name__ == "__listen__":
     listen()
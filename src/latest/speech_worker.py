@@ -0,0 +1,248 @@
+# speech_worker.py
+import asyncio
+import multiprocessing as mp
+import threading
+from typing import Optional
+
+from audio_capture import PREROLL_SECONDS
+
+TURN_RETRIES = 3  # failed turns in a row before the worker is restarted
+
+
+# ------------------------
+# Worker process side
+# ------------------------
+def _run_turn(conn, stop: threading.Event, grammar, preroll: float, talk=None, report=None) -> None:
+    from speech_recognition import get_service, decode, PARTIAL_CHUNK, USE_VAD
+    from audio_capture import get_capture
+    from vad import EnergyVAD
+
+    service = get_service()
+    recognizer, vad = None, None
+    try:
+        # setup failures (e.g. no input device) must reach the host as well
+        recognizer = service.acquire(grammar)
+        capture = get_capture()
+        vad = EnergyVAD() if USE_VAD else None
+        pos = capture.start_position(preroll)
+
+        for item in decode(recognizer, capture, pos, PARTIAL_CHUNK, partials=True, stop=stop, vad=vad, talk=talk):
+            conn.send(("hyp", item))
+        if not stop.is_set():
+            # decode() only ends on its own when the microphone failed
+            conn.send(("error", "microphone closed"))
+    except Exception as e:
+        conn.send(("error", repr(e)))
+    finally:
+        if recognizer is not None:
+            service.release(recognizer)
+        if report is not None:
+            # sent back with "done": setup time vs. model load, VAD savings
+            report.update(service.stats())
+            report["vad_skipped"] = vad.skipped_fraction if vad is not None else None
+
+
+def _worker_main(conn, mute=None, talk=None) -> None:
+    """
+    Entry point of the speech process: keeps model and microphone resident
+    and decodes one turn at a time on request. Audio is muted while the
+    shared `mute` event (arm moving) is set; with an active push-to-talk
+    `talk` gate only audio between press and release is decoded.
+
+    Commands (host -> worker): ("listen", grammar, preroll), ("stop",), ("close",)
+    Messages (worker -> host):  ("ready",), ("hyp", (text, final, alternatives)), ("done", stats), ("error", msg)
+    """
+    from speech_recognition import get_service
+    from audio_capture import get_capture
+
+    get_service().preload()
+    capture = get_capture(mute)
+    conn.send(("ready",))
+
+    stop = threading.Event()
+    turn: Optional[threading.Thread] = None
+    report: dict = {}
+
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+
+            if msg[0] == "listen":
+                stop.clear()
+                report = {}
+                turn = threading.Thread(target=_run_turn, args=(conn, stop, msg[1], msg[2], talk, report), daemon=True)
+                turn.start()
+            elif msg[0] == "stop":
+                stop.set()
+                if turn is not None:
+                    turn.join()
+                    turn = None
+                conn.send(("done", report))
+            elif msg[0] == "close":
+                break
+    finally:
+        stop.set()
+        capture.close()
+
+
+# ------------------------
+# Host side
+# ------------------------
+class SpeechWorker:
+    """
+    Runs Vosk decoding in a dedicated process.
+
+    Kaldi, the rclpy/Interbotix threads and the engine I/O no longer share
+    one interpreter and its GIL. The worker keeps the model and the
+    microphone resident; the asyncio controller talks to it over a pipe
+    and gets hypotheses as an async generator. A crashed worker is
+    restarted transparently.
+
+    `mute` is a spawn-context event (robot_state.ArmActivity.event) that
+    gates the microphone while the arm is moving, `talk` an optional
+    push_to_talk.TalkGate.
+    """
+
+    def __init__(self, start_timeout: float = 120.0, mute=None, talk=None):
+        self.start_timeout = start_timeout
+        self.mute = mute
+        self.talk = talk
+        self.restarts = 0
+        self.last_turn: Optional[dict] = None  # stats of the last finished turn
+
+        self._ctx = mp.get_context("spawn")  # no fork with ROS threads around
+        self._proc = None
+        self._conn = None
+        self._reader: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+
+    # ------------------------
+    # Process management
+    # ------------------------
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self) -> None:
+        if self.alive:
+            return
+
+        host_conn, child_conn = self._ctx.Pipe()
+        self._ready.clear()
+        self._proc = self._ctx.Process(target=_worker_main, args=(child_conn, self.mute, self.talk), daemon=True)
+        self._proc.start()
+        child_conn.close()
+        self._conn = host_conn
+
+        self._reader = threading.Thread(target=self._read_worker, args=(host_conn,), daemon=True)
+        self._reader.start()
+
+        if not self._ready.wait(self.start_timeout):
+            raise RuntimeError("Speech worker did not start.")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(("close",))
+            except Exception:
+                pass
+        if self._proc is not None:
+            self._proc.join(timeout=2.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        self._proc = None
+        self._conn = None
+
+    def _restart(self) -> None:
+        print("⚠️ Restarting speech worker...")
+        self.restarts += 1
+        self._conn = None  # the old reader must not report this worker as dead
+        if self._proc is not None and self._proc.is_alive():
+            self._proc.terminate()
+        self._proc = None
+        self.start()
+
+    def _read_worker(self, conn) -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                if conn is self._conn:
+                    self._post(("dead",))
+                return
+
+            if msg[0] == "ready":
+                self._ready.set()
+            else:
+                self._post(msg)
+
+    def _post(self, msg) -> None:
+        loop, queue = self._loop, self._queue
+        if loop is not None and queue is not None:
+            loop.call_soon_threadsafe(queue.put_nowait, msg)
+
+    # ------------------------
+    # Public API
+    # ------------------------
+    async def hypotheses(self, grammar: Optional[list] = None, preroll: float = PREROLL_SECONDS):
+        """
+        Async generator over (text, is_final, alternatives), like speech_recognition.stream_hypotheses.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self.last_turn = None
+
+        if not self.alive:
+            await self._loop.run_in_executor(None, self._restart)
+        self._conn.send(("listen", grammar, preroll))
+
+        errors = 0
+        try:
+            while True:
+                msg = await self._queue.get()
+
+                if msg[0] == "hyp":
+                    errors = 0
+                    yield msg[1]
+                elif msg[0] == "dead":
+                    await self._loop.run_in_executor(None, self._restart)
+                    self._conn.send(("listen", grammar, preroll))
+                elif msg[0] == "error":
+                    # retry the turn; a fresh worker also reopens the microphone
+                    errors += 1
+                    print(f"⚠️ Speech worker error: {msg[1]}")
+                    if errors >= TURN_RETRIES:
+                        errors = 0
+                        await self._loop.run_in_executor(None, self._restart)
+                    else:
+                        await asyncio.sleep(0.5 * errors)
+                    self._conn.send(("listen", grammar, preroll))
+        finally:
+            if self.alive:
+                try:
+                    self._conn.send(("stop",))
+                    msg = await self._queue.get()
+                    while msg[0] not in ("done", "dead"):
+                        msg = await self._queue.get()
+                    if msg[0] == "done":
+                        self.last_turn = msg[1]
+                except Exception:
+                    pass
+            self._queue = None
+
+    async def listen(self, grammar: Optional[list] = None) -> str:
+        """
+        Awaitable final transcript of the next utterance.
+        """
+        gen = self.hypotheses(grammar)
+        try:
+            async for text, final, _ in gen:
+                if final:
+                    return text
+        finally:
+            await gen.aclose()
@@ -0,0 +1,114 @@
+# tablebase.py
+import os
+from typing import Optional
+
+import chess
+import chess.syzygy
+
+SYZYGY_PATH = "syzygy"
+
+
+def _table_pieces(name: str) -> int:
+    # "KRPvKR.rtbw" -> 5
+    return sum(c.isalpha() for c in name.split(".")[0]) - 1
+
+
+class EndgameTablebase:
+    """
+    Syzygy WDL/DTZ probing in front of the engine.
+
+    Only the file names are scanned at startup. The chess.syzygy.Tablebase
+    is opened on the first position with few enough pieces and every table
+    is memory-mapped by python-chess on its first probe, so unused tables
+    cost neither RAM nor startup time.
+
+    choose() returns the DTZ-optimal move: win fastest (zeroing moves
+    first), lose slowest, otherwise keep the draw.
+    """
+
+    def __init__(self, path: str = SYZYGY_PATH):
+        self.path = path
+        self.max_pieces = 0
+
+        self._tables: Optional[chess.syzygy.Tablebase] = None
+        self.hits = 0
+        self.misses = 0
+
+        # result of the last choose(): WDL and DTZ from the side to move
+        self.last_wdl: Optional[int] = None
+        self.last_dtz: Optional[int] = None
+
+        names = os.listdir(path) if os.path.isdir(path) else []
+        wdl = {_table_pieces(n) for n in names if n.endswith(".rtbw")}
+        dtz = {_table_pieces(n) for n in names if n.endswith(".rtbz")}
+        if wdl and dtz:
+            self.max_pieces = min(max(wdl), max(dtz))
+        else:
+            print(f"⚠️ No Syzygy tables at {path}, endgames go to the engine.")
+
+    @property
+    def available(self) -> bool:
+        return self.max_pieces > 0
+
+    def covers(self, board: chess.Board) -> bool:
+        return (
+            self.max_pieces > 0
+            and not board.castling_rights
+            and chess.popcount(board.occupied) <= self.max_pieces
+        )
+
+    def _open(self) -> chess.syzygy.Tablebase:
+        if self._tables is None:
+            self._tables = chess.syzygy.open_tablebase(self.path)
+        return self._tables
+
+    def choose(self, board: chess.Board) -> Optional[str]:
+        """
+        Tablebase move for `board` as UCI, None if the position is not covered
+        (too many pieces, castling rights or a missing table).
+        """
+        if not self.covers(board) or board.is_game_over():
+            return None
+
+        tables = self._open()
+        best_key, best_move, best_dtz = None, None, None
+        try:
+            for move in board.legal_moves:
+                zeroing = board.is_zeroing(move)
+                board.push(move)
+                try:
+                    if board.is_checkmate():
+                        key, dtz = (3, 0, 0), 1
+                    else:
+                        wdl = -tables.probe_wdl(board)
+                        dtz = -tables.probe_dtz(board)
+                        if wdl > 0:
+                            # win: zeroing moves first, then the shortest DTZ
+                            key = (wdl, zeroing, -abs(dtz))
+                        elif wdl < 0:
+                            # loss: hold out as long as possible
+                            key = (wdl, not zeroing, abs(dtz))
+                        else:
+                            key = (0, 0, 0)
+                finally:
+                    board.pop()
+
+                if best_key is None or key > best_key:
+                    best_key, best_move, best_dtz = key, move, dtz
+        except (KeyError, chess.syzygy.MissingTableError):
+            self.misses += 1
+            return None
+
+        if best_move is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.last_wdl = min(2, max(-2, best_key[0]))
+        self.last_dtz = best_dtz
+        return best_move.uci()
+
+    def close(self) -> None:
+        if self._tables is not None:
+            self._tables.close()
+            self._tables = None
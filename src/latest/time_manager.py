@@ -0,0 +1,124 @@
+# time_manager.py
+from typing import Optional
+
+import chess
+
+# non-pawn material for the game phase, 24 = all pieces on the board
+PHASE_WEIGHTS = {chess.KNIGHT: 1, chess.BISHOP: 1, chess.ROOK: 2, chess.QUEEN: 4}
+FULL_PHASE = 24
+
+
+def game_phase(board: chess.Board) -> float:
+    """
+    1.0 with all pieces on the board, 0.0 with kings and pawns only.
+    """
+    phase = sum(w * len(board.pieces(p, c)) for p, w in PHASE_WEIGHTS.items() for c in chess.COLORS)
+    return min(phase, FULL_PHASE) / FULL_PHASE
+
+
+def complexity(board: chess.Board) -> float:
+    """
+    Rough factor around 1.0: more legal moves, captures and checks
+    available -> more time.
+    """
+    moves = list(board.legal_moves)
+    if len(moves) <= 1:
+        return 0.0
+    captures = sum(board.is_capture(m) for m in moves)
+    checks = sum(board.gives_check(m) for m in moves)
+    factor = 0.6 + len(moves) / 50 + 0.05 * captures + 0.05 * checks
+    return max(0.6, min(1.6, factor))
+
+
+class TimeManager:
+    """
+    Per-game thinking budget for the engine.
+
+    allocate() splits the remaining budget over the expected number of
+    moves left and scales it by game phase (most time in the middlegame)
+    and position complexity, clamped to [min_move_time, max_move_time].
+    record() charges the time actually used, so fast moves leave more for
+    later ones. Searches are stopped at max_move_time at the latest, which
+    bounds the engine latency per move.
+
+    With use_nodes the allocation is handed to the engine as a node limit
+    (from the measured nodes per second) instead of a movetime, which makes
+    the strength independent of machine load.
+    """
+
+    def __init__(
+        self,
+        budget: float = 300.0,
+        max_move_time: float = 15.0,
+        min_move_time: float = 0.5,
+        moves_left: int = 40,
+        use_nodes: bool = False,
+    ):
+        self.budget = budget
+        self.max_move_time = max_move_time
+        self.min_move_time = min_move_time
+        self.moves_left = moves_left
+        self.use_nodes = use_nodes
+
+        self.used = 0.0
+        self.nps: Optional[int] = None
+        self.times: list[float] = []
+        self.allotted: list[float] = []
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.used)
+
+    def reset(self) -> None:
+        self.used = 0.0
+        self.times.clear()
+        self.allotted.clear()
+
+    def allocate(self, board: chess.Board) -> float:
+        """
+        Thinking time in seconds for the side to move on `board`.
+        """
+        # fewer moves expected once the game goes on, but never plan for less than 10
+        moves_left = max(10, self.moves_left - len(board.move_stack) // 4)
+        base = self.remaining / moves_left
+
+        phase = game_phase(board)
+        # bell over the phase: the middlegame gets the most time
+        phase_factor = 0.7 + 0.6 * max(0.0, 1.0 - abs(phase - 0.5) / 0.5)
+
+        seconds = base * phase_factor * complexity(board)
+        upper = min(self.max_move_time, max(self.min_move_time, self.remaining / 2))
+        return max(self.min_move_time, min(upper, seconds))
+
+    def limits(self, seconds: float) -> dict:
+        """
+        UCI go limits for an allocation from allocate().
+        """
+        if self.use_nodes and self.nps:
+            return {"nodes": int(seconds * self.nps)}
+        return {"movetime": int(seconds * 1000)}
+
+    def timeout(self, seconds: float) -> float:
+        # hard stop if the engine overruns its limit (node limits, slow machines)
+        return min(self.max_move_time, seconds * 1.5 + 0.5)
+
+    def record(self, elapsed: float, allotted: float, nps: Optional[int] = None) -> None:
+        self.used += elapsed
+        self.times.append(elapsed)
+        self.allotted.append(allotted)
+        if nps:
+            self.nps = nps
+
+    def stats(self) -> dict:
+        if not self.times:
+            return {"moves": 0}
+        times = sorted(self.times)
+        return {
+            "moves": len(times),
+            "used": round(self.used, 2),
+            "remaining": round(self.remaining, 2),
+            "mean": round(sum(times) / len(times), 3),
+            "p95": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+            "max": round(times[-1], 3),
+            "over_allotted": sum(t > a for t, a in zip(self.times, self.allotted)),
+        }
@@ -0,0 +1,122 @@
+# vad.py
+from collections import deque
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class EnergyVAD:
+    """
+    Energy + zero-crossing voice activity detection.
+
+    Works on NumPy views of the int16 capture buffer, one 20 ms frame at a
+    time but vectorized per chunk. Only speech frames (plus pre-roll and
+    hangover padding) are passed on, so Kaldi does not burn CPU on the
+    silence while the player is thinking.
+
+    The energy threshold follows a running noise floor estimated from the
+    frames classified as silence.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 20,
+        min_rms: float = 300.0,
+        noise_factor: float = 3.0,
+        max_zcr: float = 0.45,
+        hangover_ms: int = 300,
+        preroll_ms: int = 200,
+    ):
+        self.frame = sample_rate * frame_ms // 1000
+        self.min_rms = min_rms
+        self.noise_factor = noise_factor
+        self.max_zcr = max_zcr
+        self.hangover_frames = hangover_ms // frame_ms
+        self.preroll_frames = preroll_ms // frame_ms
+
+        self.noise_rms = min_rms / noise_factor
+        self._hang = 0
+        self._in_speech = False
+        self._preroll: deque = deque(maxlen=self.preroll_frames)
+
+        # Counters
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    @property
+    def skipped_fraction(self) -> float:
+        return self.frames_skipped / self.frames_total if self.frames_total else 0.0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._in_speech
+
+    def reset(self) -> None:
+        self._hang = 0
+        self._in_speech = False
+        self._preroll.clear()
+
+    def classify(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Per-frame speech flags for `samples` (trailing partial frame ignored).
+        """
+        n = len(samples) // self.frame
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = samples[: n * self.frame].reshape(n, self.frame)
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+        zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / self.frame
+
+        threshold = max(self.min_rms, self.noise_rms * self.noise_factor)
+        speech = (rms > threshold) & (zcr <= self.max_zcr)
+
+        quiet = rms[~speech]
+        if len(quiet):
+            self.noise_rms = 0.95 * self.noise_rms + 0.05 * float(np.mean(quiet))
+        return speech
+
+    def process(self, samples: np.ndarray) -> tuple[bytes, bool]:
+        """
+        Filters one chunk of int16 samples.
+
+        Returns (speech_pcm, segment_ended). segment_ended is True once the
+        hangover after a speech segment ran out, so the caller can ask the
+        recognizer for a final result.
+        """
+        flags = self.classify(samples)
+        n = len(flags)
+        out = []
+        ended = False
+
+        for i in range(n):
+            frame = samples[i * self.frame:(i + 1) * self.frame]
+
+            if flags[i]:
+                if not self._in_speech:
+                    out.extend(self._preroll)
+                    self.frames_skipped -= len(self._preroll)
+                    self._preroll.clear()
+                    self._in_speech = True
+                self._hang = self.hangover_frames
+                out.append(frame)
+            elif self._in_speech and self._hang > 0:
+                self._hang -= 1
+                out.append(frame)
+            else:
+                if self._in_speech:
+                    self._in_speech = False
+                    ended = True
+                self._preroll.append(frame.copy())
+                self.frames_skipped += 1
+
+        # trailing partial frame follows the last decision
+        tail = samples[n * self.frame:]
+        if len(tail) and self._in_speech:
+            out.append(tail)
+
+        self.frames_total += n
+        pcm = b"".join(f.tobytes() for f in out)
+        return pcm, ended
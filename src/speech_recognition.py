@@ -1,5 +1,7 @@
 import sys
 import json
+import time
+import threading
 import pyaudio
 from vosk import Model, KaldiRecognizer, SetLogLevel
 
@@ -7,19 +9,50 @@ SetLogLevel(-1)  # completely disable Vosk/Kaldi logging
 
 MODEL_PATH = "vosk-model-small-de-zamia-0.3"  # Change if needed
 
+ALLOWED_WORDS = [
+    "springer", "läufer", "turm", "dame", "könig", "bauer",
+    "a", "b", "c", "d", "e", "f", "g", "h",
+    "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht",
+    "von", "nach", "auf", "zu"
+]
+
+# Loaded once per process and shared by every listen() call
+_model = None
+_recognizer = None
+_lock = threading.Lock()
+
+# Counters: one-time model load vs. per-turn recognizer setup
+stats = {"model_load_s": 0.0, "turns": 0, "last_setup_s": 0.0}
+
+
+def get_recognizer():
+    global _model, _recognizer
+
+    start = time.perf_counter()
+    with _lock:
+        if _model is None:
+            print("Loading Vosk model...")
+            _model = Model(MODEL_PATH)
+            stats["model_load_s"] = time.perf_counter() - start
+            start = time.perf_counter()
+
+        if _recognizer is None:
+            _recognizer = KaldiRecognizer(_model, 16000, json.dumps(ALLOWED_WORDS, ensure_ascii=False))
+            _recognizer.SetWords(True)
+        else:
+            _recognizer.Reset()
+
+    stats["turns"] += 1
+    stats["last_setup_s"] = time.perf_counter() - start
+    return _recognizer
+
+
 def listen():
-    print("Loading Vosk model...")
-    model = Model(MODEL_PATH)
-
-    allowed = [
-        "springer", "läufer", "turm", "dame", "könig", "bauer",
-        "a", "b", "c", "d", "e", "f", "g", "h",
-        "eins", "zwei", "drei", "vier", "fünf", "sechs", "sieben", "acht",
-        "von", "nach", "auf", "zu"
-    ]
-
-    recognizer = KaldiRecognizer(model, 16000, json.dumps(allowed, ensure_ascii=False))
-    recognizer.SetWords(True)
+    recognizer = get_recognizer()
+    print(
+        f"• Recognizer setup {stats['last_setup_s'] * 1000:.1f} ms "
+        f"(model load {stats['model_load_s']:.2f}s, once)"
+    )
 
     p = pyaudio.PyAudio()
     stream = p.open(